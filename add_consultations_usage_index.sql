@@ -0,0 +1,9 @@
+-- Índice de cobertura para estatísticas de uso (get_user_usage_stats)
+-- Permite COUNT/SUM por usuário e período direto do índice, sem ler as linhas.
+-- Substitui idx_user_created e idx_consultations_user_date, ambos (user_id, created_at) e
+-- prefixos do novo índice: manter os três só encarece cada INSERT em consultations.
+-- Um único ALTER TABLE garante que a FK fk_consultations_user nunca fica sem índice em user_id.
+ALTER TABLE consultations
+  ADD INDEX ix_cons_user_created (user_id, created_at, total_cost_cents),
+  DROP INDEX idx_user_created,
+  DROP INDEX idx_consultations_user_date;
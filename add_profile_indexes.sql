@@ -0,0 +1,11 @@
+-- Índices compostos para as consultas de perfil e créditos
+-- (ix_cons_user_created já criado em add_consultations_usage_index.sql)
+
+-- Somatórios por tipo (trigger de saldo e carga de user_stats) direto do índice
+CREATE INDEX ix_credit_tx_user_type ON credit_transactions (user_id, type, amount_cents);
+
+-- Contagem de API keys ativas por usuário
+CREATE INDEX ix_apikeys_user_active ON api_keys (user_id, is_active);
+
+-- Assinatura ativa mais recente do usuário (filtro + ORDER BY pelo índice)
+CREATE INDEX ix_subs_user_status_created ON subscriptions (user_id, status, created_at DESC);
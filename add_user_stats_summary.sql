@@ -0,0 +1,189 @@
+-- Tabela de agregados por usuário (perfil /auth/me)
+-- Evita varrer todo o histórico de credit_transactions/consultations a cada carga de perfil.
+-- Mantida incrementalmente por triggers (INSERT/UPDATE/DELETE); monthly_queries (janela
+-- móvel de 30 dias) continua calculado na consulta via índice (user_id, created_at).
+--
+-- Ordem: tabela -> triggers -> carga inicial. Com os triggers já ativos, nenhuma linha
+-- gravada durante a migração fica de fora; a carga inicial sobrescreve os totais com
+-- os valores absolutos (upsert), então o que os triggers somaram antes dela não duplica.
+
+CREATE TABLE IF NOT EXISTS user_stats (
+  user_id char(36) NOT NULL,
+  credits_purchased_cents bigint NOT NULL DEFAULT 0,
+  credits_spent_cents bigint NOT NULL DEFAULT 0,
+  total_queries int NOT NULL DEFAULT 0,
+  last_query_date datetime DEFAULT NULL,
+  api_keys_count int NOT NULL DEFAULT 0,
+  updated_at datetime DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  PRIMARY KEY (user_id),
+  CONSTRAINT fk_user_stats_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Agregados de créditos, consultas e API keys por usuário';
+
+DROP TRIGGER IF EXISTS trigger_user_stats_credit_transactions;
+DROP TRIGGER IF EXISTS trigger_user_stats_credit_transactions_update;
+DROP TRIGGER IF EXISTS trigger_user_stats_credit_transactions_delete;
+DROP TRIGGER IF EXISTS trigger_user_stats_consultations;
+DROP TRIGGER IF EXISTS trigger_user_stats_consultations_update;
+DROP TRIGGER IF EXISTS trigger_user_stats_consultations_delete;
+DROP TRIGGER IF EXISTS trigger_user_stats_api_keys_insert;
+DROP TRIGGER IF EXISTS trigger_user_stats_api_keys_update;
+DROP TRIGGER IF EXISTS trigger_user_stats_api_keys_delete;
+
+DELIMITER ;;
+
+-- credit_transactions: soma a contribuição nova, desconta a antiga
+
+CREATE TRIGGER trigger_user_stats_credit_transactions
+    AFTER INSERT ON credit_transactions
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO user_stats (user_id, credits_purchased_cents, credits_spent_cents)
+        VALUES (
+            NEW.user_id,
+            CASE WHEN NEW.type IN ('add', 'purchase') THEN NEW.amount_cents ELSE 0 END,
+            CASE WHEN NEW.type IN ('subtract', 'spend', 'usage') THEN NEW.amount_cents ELSE 0 END
+        )
+        ON DUPLICATE KEY UPDATE
+            credits_purchased_cents = credits_purchased_cents + VALUES(credits_purchased_cents),
+            credits_spent_cents = credits_spent_cents + VALUES(credits_spent_cents);
+    END;;
+
+CREATE TRIGGER trigger_user_stats_credit_transactions_update
+    AFTER UPDATE ON credit_transactions
+    FOR EACH ROW
+    BEGIN
+        UPDATE user_stats
+        SET credits_purchased_cents = credits_purchased_cents
+                - CASE WHEN OLD.type IN ('add', 'purchase') THEN OLD.amount_cents ELSE 0 END,
+            credits_spent_cents = credits_spent_cents
+                - CASE WHEN OLD.type IN ('subtract', 'spend', 'usage') THEN OLD.amount_cents ELSE 0 END
+        WHERE user_id = OLD.user_id;
+
+        INSERT INTO user_stats (user_id, credits_purchased_cents, credits_spent_cents)
+        VALUES (
+            NEW.user_id,
+            CASE WHEN NEW.type IN ('add', 'purchase') THEN NEW.amount_cents ELSE 0 END,
+            CASE WHEN NEW.type IN ('subtract', 'spend', 'usage') THEN NEW.amount_cents ELSE 0 END
+        )
+        ON DUPLICATE KEY UPDATE
+            credits_purchased_cents = credits_purchased_cents + VALUES(credits_purchased_cents),
+            credits_spent_cents = credits_spent_cents + VALUES(credits_spent_cents);
+    END;;
+
+CREATE TRIGGER trigger_user_stats_credit_transactions_delete
+    AFTER DELETE ON credit_transactions
+    FOR EACH ROW
+    BEGIN
+        UPDATE user_stats
+        SET credits_purchased_cents = credits_purchased_cents
+                - CASE WHEN OLD.type IN ('add', 'purchase') THEN OLD.amount_cents ELSE 0 END,
+            credits_spent_cents = credits_spent_cents
+                - CASE WHEN OLD.type IN ('subtract', 'spend', 'usage') THEN OLD.amount_cents ELSE 0 END
+        WHERE user_id = OLD.user_id;
+    END;;
+
+-- consultations: contagem por delta; last_query_date recalculado pelo índice
+-- (user_id, created_at) quando a linha sai do usuário ou muda de data
+
+CREATE TRIGGER trigger_user_stats_consultations
+    AFTER INSERT ON consultations
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO user_stats (user_id, total_queries, last_query_date)
+        VALUES (NEW.user_id, 1, NEW.created_at)
+        ON DUPLICATE KEY UPDATE
+            total_queries = total_queries + 1,
+            last_query_date = GREATEST(COALESCE(last_query_date, VALUES(last_query_date)), VALUES(last_query_date));
+    END;;
+
+CREATE TRIGGER trigger_user_stats_consultations_update
+    AFTER UPDATE ON consultations
+    FOR EACH ROW
+    BEGIN
+        IF NOT (OLD.user_id <=> NEW.user_id) THEN
+            UPDATE user_stats
+            SET total_queries = total_queries - 1,
+                last_query_date = (SELECT MAX(c.created_at) FROM consultations c WHERE c.user_id = OLD.user_id)
+            WHERE user_id = OLD.user_id;
+
+            INSERT INTO user_stats (user_id, total_queries, last_query_date)
+            VALUES (NEW.user_id, 1, NEW.created_at)
+            ON DUPLICATE KEY UPDATE
+                total_queries = total_queries + 1,
+                last_query_date = GREATEST(COALESCE(last_query_date, VALUES(last_query_date)), VALUES(last_query_date));
+        ELSEIF NOT (OLD.created_at <=> NEW.created_at) THEN
+            UPDATE user_stats
+            SET last_query_date = (SELECT MAX(c.created_at) FROM consultations c WHERE c.user_id = NEW.user_id)
+            WHERE user_id = NEW.user_id;
+        END IF;
+    END;;
+
+CREATE TRIGGER trigger_user_stats_consultations_delete
+    AFTER DELETE ON consultations
+    FOR EACH ROW
+    BEGIN
+        UPDATE user_stats
+        SET total_queries = total_queries - 1,
+            last_query_date = (SELECT MAX(c.created_at) FROM consultations c WHERE c.user_id = OLD.user_id)
+        WHERE user_id = OLD.user_id;
+    END;;
+
+-- api_keys: conta apenas chaves ativas
+
+CREATE TRIGGER trigger_user_stats_api_keys_insert
+    AFTER INSERT ON api_keys
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO user_stats (user_id, api_keys_count)
+        VALUES (NEW.user_id, IF(NEW.is_active = 1, 1, 0))
+        ON DUPLICATE KEY UPDATE
+            api_keys_count = api_keys_count + VALUES(api_keys_count);
+    END;;
+
+CREATE TRIGGER trigger_user_stats_api_keys_update
+    AFTER UPDATE ON api_keys
+    FOR EACH ROW
+    BEGIN
+        IF NOT (OLD.user_id <=> NEW.user_id) OR COALESCE(OLD.is_active, 0) <> COALESCE(NEW.is_active, 0) THEN
+            UPDATE user_stats
+            SET api_keys_count = api_keys_count - IF(OLD.is_active = 1, 1, 0)
+            WHERE user_id = OLD.user_id;
+
+            INSERT INTO user_stats (user_id, api_keys_count)
+            VALUES (NEW.user_id, IF(NEW.is_active = 1, 1, 0))
+            ON DUPLICATE KEY UPDATE
+                api_keys_count = api_keys_count + VALUES(api_keys_count);
+        END IF;
+    END;;
+
+CREATE TRIGGER trigger_user_stats_api_keys_delete
+    AFTER DELETE ON api_keys
+    FOR EACH ROW
+    BEGIN
+        UPDATE user_stats
+        SET api_keys_count = api_keys_count - IF(OLD.is_active = 1, 1, 0)
+        WHERE user_id = OLD.user_id;
+    END;;
+
+DELIMITER ;
+
+-- Carga inicial a partir do histórico existente (upsert com valores absolutos).
+-- O INSERT ... SELECT lê as tabelas de origem com locks compartilhados, então escritas
+-- concorrentes esperam e são aplicadas pelos triggers sobre o total já carregado.
+INSERT INTO user_stats (user_id, credits_purchased_cents, credits_spent_cents, total_queries, last_query_date, api_keys_count)
+SELECT
+  u.id,
+  (SELECT COALESCE(SUM(CASE WHEN ct.type IN ('add', 'purchase') THEN ct.amount_cents ELSE 0 END), 0)
+     FROM credit_transactions ct WHERE ct.user_id = u.id),
+  (SELECT COALESCE(SUM(CASE WHEN ct.type IN ('subtract', 'spend', 'usage') THEN ct.amount_cents ELSE 0 END), 0)
+     FROM credit_transactions ct WHERE ct.user_id = u.id),
+  (SELECT COUNT(*) FROM consultations c WHERE c.user_id = u.id),
+  (SELECT MAX(c.created_at) FROM consultations c WHERE c.user_id = u.id),
+  (SELECT COUNT(*) FROM api_keys k WHERE k.user_id = u.id AND k.is_active = 1)
+FROM users u
+ON DUPLICATE KEY UPDATE
+  credits_purchased_cents = VALUES(credits_purchased_cents),
+  credits_spent_cents = VALUES(credits_spent_cents),
+  total_queries = VALUES(total_queries),
+  last_query_date = VALUES(last_query_date),
+  api_keys_count = VALUES(api_keys_count);
@@ -3,6 +3,8 @@ Conexão com banco de dados MariaDB (migração de Supabase)
 """
 import pymysql
 from pymysql.cursors import DictCursor
+import aiomysql
+import asyncio
 from typing import Optional, Dict, Any, List
 import os
 import structlog
@@ -24,6 +26,9 @@ MARIADB_USER = os.getenv("MARIADB_USER", "valida_saas")
 MARIADB_PASSWORD = os.getenv("MARIADB_PASS", "")  # Corrigido: MARIADB_PASS
 MARIADB_DATABASE = os.getenv("MARIADB_DATABASE", "valida_saas")
 MARIADB_CHARSET = os.getenv("MARIADB_CHARSET", "utf8mb4")
+MARIADB_POOL_MIN = int(os.getenv("MARIADB_POOL_MIN", "10"))
+MARIADB_POOL_MAX = int(os.getenv("MARIADB_POOL_MAX", "50"))
+MARIADB_POOL_RECYCLE = int(os.getenv("MARIADB_POOL_RECYCLE", "3600"))
 
 # Log de configuração para debug
 logger.info("Configuração MariaDB carregada",
@@ -67,6 +72,52 @@ def get_mariadb_connection() -> pymysql.Connection:
     
     return _connection_pool
 
+# Pool assíncrono usado por execute_sql (conexões reutilizadas, sem handshake por query)
+_async_pool: Optional[aiomysql.Pool] = None
+_async_pool_lock = asyncio.Lock()
+
+async def get_async_pool() -> aiomysql.Pool:
+    """Retorna o pool aiomysql (criado na primeira chamada, dentro do event loop)"""
+    global _async_pool
+    
+    if _async_pool is None:
+        async with _async_pool_lock:
+            if _async_pool is None:
+                if not MARIADB_HOST or not MARIADB_USER:
+                    raise ValueError("Variáveis MARIADB_HOST e MARIADB_USER são obrigatórias")
+                
+                _async_pool = await aiomysql.create_pool(
+                    host=MARIADB_HOST,
+                    port=MARIADB_PORT,
+                    user=MARIADB_USER,
+                    password=MARIADB_PASSWORD,
+                    db=MARIADB_DATABASE,
+                    charset=MARIADB_CHARSET,
+                    cursorclass=aiomysql.DictCursor,
+                    autocommit=True,  # Auto-commit para compatibilidade
+                    connect_timeout=10,
+                    minsize=MARIADB_POOL_MIN,
+                    maxsize=MARIADB_POOL_MAX,
+                    pool_recycle=MARIADB_POOL_RECYCLE
+                )
+                logger.info("Pool MariaDB inicializado", 
+                           host=MARIADB_HOST, 
+                           database=MARIADB_DATABASE,
+                           minsize=MARIADB_POOL_MIN,
+                           maxsize=MARIADB_POOL_MAX)
+    
+    return _async_pool
+
+async def close_async_pool():
+    """Fecha o pool aiomysql (shutdown da aplicação)"""
+    global _async_pool
+    
+    if _async_pool is not None:
+        _async_pool.close()
+        await _async_pool.wait_closed()
+        _async_pool = None
+        logger.info("Pool MariaDB encerrado")
+
 def get_db_connection():
     """Alias para get_mariadb_connection - compatibilidade"""
     return get_mariadb_connection()
@@ -99,34 +150,48 @@ async def execute_sql(sql: str, params: tuple = (), fetch: str = "all") -> Dict[
     Args:
         sql: Query SQL
         params: Parâmetros da query
-        fetch: Tipo de retorno ("all", "one", "none")
+        fetch: Tipo de retorno ("all", "one", "scalar", "none")
+               "scalar" retorna só a primeira coluna da primeira linha
+               (cursor de tuplas, sem montar dict por linha)
     
     Returns:
         Dict com resultado da query
     """
+    # Sem PREPARE no servidor: aiomysql usa o protocolo texto (parâmetros
+    # interpolados no cliente); PREPARE/EXECUTE via SQL exigiria idas extras
+    # ao banco (SET @p...; EXECUTE) e custaria mais que o parse economizado.
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(sql, params)
-            
-            if fetch == "all":
-                data = cursor.fetchall()
-            elif fetch == "one":
-                data = cursor.fetchone()
-            else:
-                data = None
-            
-            return {
-                "data": data,
-                "count": cursor.rowcount,
-                "error": None
-            }
+        pool = await get_async_pool()
+        async with pool.acquire() as connection:
+            # Cursor de tuplas no modo scalar; demais usam o DictCursor padrão do pool
+            cursor_classes = (aiomysql.Cursor,) if fetch == "scalar" else ()
+            async with connection.cursor(*cursor_classes) as cursor:
+                await cursor.execute(sql, params)
+                
+                if fetch == "all":
+                    data = await cursor.fetchall()
+                elif fetch == "one":
+                    data = await cursor.fetchone()
+                elif fetch == "scalar":
+                    row = await cursor.fetchone()
+                    data = row[0] if row else None
+                else:
+                    data = None
+                
+                return {
+                    "data": data,
+                    "count": cursor.rowcount,
+                    "error": None
+                }
             
     except Exception as e:
         logger.error("Erro na execução SQL", sql=sql, error=str(e))
         return {
             "data": None,
             "count": 0, 
-            "error": str(e)
+            "error": str(e),
+            # Código MySQL (ex.: 1062 = chave duplicada) para tratamento específico
+            "error_code": e.args[0] if isinstance(e, pymysql.err.MySQLError) and e.args else None
         }
 
 def generate_uuid() -> str:
@@ -228,16 +293,25 @@ async def execute_query(table: str, query_type: str = "select", **kwargs):
 class UserRepository:
     """Repository para operações com usuários - Migrado para MariaDB"""
     
+    # Colunas lidas pelos consumidores (password_hash só sai do banco no login)
+    PUBLIC_COLUMNS = "id, email, name, is_active, created_at, last_login"
+    
     @staticmethod
     async def get_by_id(user_id: str):
         """Busca usuário por ID"""
-        result = await execute_sql("SELECT * FROM users WHERE id = %s", (user_id,), "one")
+        result = await execute_sql(
+            f"SELECT {UserRepository.PUBLIC_COLUMNS} FROM users WHERE id = %s", (user_id,), "one"
+        )
         return result["data"] if result["data"] else None
     
     @staticmethod
     async def get_by_email(email: str):
-        """Busca usuário por email"""
-        result = await execute_sql("SELECT * FROM users WHERE email = %s", (email,), "one")
+        """Busca usuário por email (inclui password_hash para autenticação)"""
+        result = await execute_sql(
+            f"SELECT {UserRepository.PUBLIC_COLUMNS}, password_hash FROM users WHERE email = %s LIMIT 1",
+            (email,),
+            "one"
+        )
         return result["data"] if result["data"] else None
     
     @staticmethod
@@ -386,9 +460,9 @@ class CreditTransactionRepository:
 
 # Função de inicialização
 async def init_database():
-    """Inicializa conexão com banco de dados"""
+    """Inicializa pool de conexões com banco de dados"""
     try:
-        connection = get_mariadb_connection()
+        await get_async_pool()
         logger.info("Banco de dados inicializado com sucesso")
         return True
     except Exception as e:
@@ -64,12 +64,21 @@ async def lifespan(app: FastAPI):
         else:
             logger.info("api_iniciada_modo_api_oficial_sem_rpa")
         
+        # Pool de conexões MariaDB (aquecido antes das primeiras requisições)
+        from api.database.connection import init_database
+        await init_database()
+        
         # Configurar services nos routers
         status.set_scraping_service(scraping_service)  # Novo: usar scraping_service
         status.set_session_manager(session_manager)   # Mantido para compatibilidade 
         cnpj.set_scraping_service(scraping_service)   # Atualizado
         session.set_session_manager(session_manager)   # Mantido como está
         
+        # Serviço unificado: reutilizar o scraping_service global e pré-inicializar CNPJa
+        from api.services.unified_consultation_service import unified_consultation_service
+        unified_consultation_service.set_scraping_service(scraping_service)
+        unified_consultation_service.warmup()
+        
         # Sincronizar produtos Stripe com MariaDB no startup (otimização)
         try:
             from api.services.stripe_sync_service import stripe_sync_service, get_last_sync_info
@@ -95,6 +104,13 @@ async def lifespan(app: FastAPI):
         logger.error("erro_inicializacao_api", error=str(e))
         raise
     finally:
+        # Shutdown: fechar conexões keep-alive do serviço unificado
+        from api.services.unified_consultation_service import unified_consultation_service
+        await unified_consultation_service.close()
+        
+        from api.database.connection import close_async_pool
+        await close_async_pool()
+        
         # Shutdown: Limpar apenas se usar RPA
         if session_manager:
             await session_manager.cleanup()
@@ -95,13 +95,12 @@ async def get_current_user(
     # Verificar se é uma API key (MIGRADO: MariaDB)
     if token.startswith("rcp_"):
         try:
+            # Usar APIKeyService migrado para MariaDB
+            from api.services.api_key_service import api_key_service, hash_api_key
+            
             # Calcular o hash da chave visível para buscar no MariaDB
-            import hashlib
-            key_hash = hashlib.sha256(token.encode()).hexdigest()
+            key_hash = hash_api_key(token)
             logger.info(f"Buscando API key com hash: {key_hash[:16]}...")
-            
-            # Usar APIKeyService migrado para MariaDB
-            from api.services.api_key_service import api_key_service
             api_key_data = await api_key_service.get_api_key_by_hash(key_hash)
             
             logger.info(f"Resultado da busca: {'1' if api_key_data else '0'} chaves encontradas")
@@ -202,13 +201,12 @@ async def validate_jwt_or_api_key(
         
         # Buscar usuário pela API key no MariaDB (MIGRADO)
         try:
+            # Usar APIKeyService migrado para MariaDB
+            from api.services.api_key_service import api_key_service, hash_api_key
+            
             # Calcular o hash da chave visível para buscar no MariaDB
-            import hashlib
-            key_hash = hashlib.sha256(token.encode()).hexdigest()
+            key_hash = hash_api_key(token)
             logger.info(f"Buscando API key com hash: {key_hash[:16]}...")
-            
-            # Usar APIKeyService migrado para MariaDB
-            from api.services.api_key_service import api_key_service
             api_key_data = await api_key_service.get_api_key_by_hash(key_hash)
             
             logger.info(f"Resultado da busca: {'1' if api_key_data else '0'} chaves encontradas")
@@ -4,17 +4,16 @@ Router de autenticação migrado para MariaDB
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-import hashlib
 import secrets
 import jwt
 from datetime import datetime, timedelta
 import os
 import structlog
-from passlib.context import CryptContext
 
 # Importar componentes MariaDB
 from api.database.connection import UserRepository, generate_uuid
-from api.services.api_key_service import api_key_service
+from api.services.api_key_service import api_key_service, hash_api_key
+from api.services.user_service import user_service, hash_password, verify_password
 from api.models.saas_models import APIKeyCreate
 
 # Configurar logger
@@ -25,9 +24,6 @@ JWT_SECRET = os.getenv("JWT_SECRET", "valida-jwt-secret-2024")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
-# Configurar Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 logger.info("Router de autenticação configurado para MariaDB")
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -61,19 +57,11 @@ def generate_token(user_id: str, email: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def hash_password(password: str) -> str:
-    """Hash da senha com bcrypt"""
-    return pwd_context.hash(password)
-
-def verify_password(password: str, hashed_password: str) -> bool:
-    """Verifica senha com bcrypt"""
-    return pwd_context.verify(password, hashed_password)
-
 def generate_api_key() -> tuple[str, str]:
     """Gera uma API key e seu hash"""
     key_bytes = secrets.token_bytes(32)
     visible_key = f"rcp_{key_bytes.hex()}"
-    key_hash = hashlib.sha256(visible_key.encode()).hexdigest()
+    key_hash = hash_api_key(visible_key)
     return visible_key, key_hash
 
 async def create_user_in_db(email: str, password_hash: str, name: str = None):
@@ -150,13 +138,14 @@ async def authenticate_user(email: str, password: str):
         if not user.get('password_hash'):
             raise HTTPException(status_code=401, detail="Usuário sem senha configurada")
             
-        if not verify_password(password, user['password_hash']):
+        if not await verify_password(password, user['password_hash']):
             raise HTTPException(status_code=401, detail="Senha incorreta")
         
         # Atualizar último login
         await UserRepository.update(user["id"], {
             "last_login": datetime.now()
         })
+        user_service.invalidate_profile(user["id"])
         
         # Buscar API keys ativas do usuário usando o serviço migrado
         api_keys = await api_key_service.get_user_api_keys(user["id"])
@@ -228,7 +217,7 @@ async def register(request: RegisterRequest, response: Response):
         if len(request.password) < 8:
             raise HTTPException(status_code=400, detail="Senha deve ter pelo menos 8 caracteres")
         
-        password_hash = hash_password(request.password)
+        password_hash = await hash_password(request.password)
         
         # Criar usuário
         user = await create_user_in_db(
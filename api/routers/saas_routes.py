@@ -2,6 +2,7 @@
 Rotas da API SaaS para o Valida
 """
 import os
+import asyncio
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from typing import List, Optional
@@ -235,20 +236,18 @@ async def get_dashboard_stats(user: AuthUser = Depends(require_auth)):
     Obtém estatísticas do dashboard do usuário
     """
     try:
-        # Buscar informações do usuário
-        user_info = await user_service.get_user(user.user_id)
+        # Usuário, estatísticas de uso e API keys são independentes: buscar em paralelo
+        user_info, usage_stats, api_keys = await asyncio.gather(
+            user_service.get_user(user.user_id),
+            user_service.get_user_usage_stats(user.user_id),
+            api_key_service.get_user_api_keys(user.user_id)
+        )
         if not user_info:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário não encontrado"
             )
         
-        # Buscar estatísticas de uso
-        usage_stats = await user_service.get_user_usage_stats(user.user_id)
-        
-        # Buscar API keys
-        api_keys = await api_key_service.get_user_api_keys(user.user_id)
-        
         # Mock para subscription (será implementado posteriormente)
         from api.models.saas_models import SubscriptionResponse, SubscriptionPlan, SubscriptionStatus
         subscription = SubscriptionResponse(
@@ -300,7 +299,9 @@ def clean_cnpj(cnpj: str) -> str:
     import re
     return re.sub(r'[^0-9]', '', cnpj)
 
-@router.post("/cnpj/consult", response_model=ConsultationResponse)
+# response_model=None: o resultado já é um ConsultationResponse montado pelo serviço,
+# serializado uma única vez; o schema segue documentado via `responses`
+@router.post("/cnpj/consult", response_model=None, responses={200: {"model": ConsultationResponse}})
 async def consult_cnpj(
     consultation_request: ConsultationRequest,
     http_request: Request,  # Objeto Request para capturar IP
@@ -440,10 +441,8 @@ async def consult_cnpj(
         original_registrations = consultation_request.registrations
         consultation_request.registrations = 'BR' if original_registrations else None
         
-        # Usar novo serviço unificado
-        from api.services.unified_consultation_service import UnifiedConsultationService
-        
-        unified_service = UnifiedConsultationService()
+        # Usar serviço unificado compartilhado (sub-serviços pré-inicializados no startup)
+        from api.services.unified_consultation_service import unified_consultation_service as unified_service
         
         logger.info("iniciando_consulta_unificada", 
                    cnpj=consultation_request.cnpj[:8] + "****",
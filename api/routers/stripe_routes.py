@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from api.middleware.auth_middleware import require_auth, AuthUser
 from api.database.connection import execute_sql
+from api.services.user_service import user_service
 
 logger = structlog.get_logger(__name__)
 
@@ -608,6 +609,7 @@ async def toggle_auto_renewal(
             logger.error(f"❌ Erro ao atualizar renovação automática no banco: {update_result['error']}")
             raise Exception("Erro ao atualizar configuração")
         
+        user_service.invalidate_profile(user.user_id)
         status_message = "ativada" if enabled else "desativada"
         logger.info(f"✅ Renovação automática {status_message} para usuário {user.user_id}")
         
@@ -828,6 +830,7 @@ async def cancel_previous_subscriptions(customer_id: str, current_subscription_i
                 logger.error(f"❌ Erro ao cancelar assinatura {stripe_subscription_id}: {e}")
                 continue
         
+        user_service.invalidate_profile(user_id)
         logger.info(f"✅ Processo de cancelamento de assinaturas anteriores concluído")
         
     except Exception as e:
@@ -986,6 +989,7 @@ async def process_subscription_manually(session):
             logger.error(f"❌ Erro ao inserir assinatura: {subscription_result['error']}")
             return
         
+        user_service.invalidate_profile(user_id)
         logger.info(f"✅ Assinatura registrada no MariaDB: {subscription_id}")
         
         # Adicionar créditos equivalentes ao valor pago
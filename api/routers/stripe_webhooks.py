@@ -10,6 +10,7 @@ from datetime import datetime
 
 from api.services.credit_service import add_user_credits, get_user_balance
 from api.database.connection import execute_sql
+from api.services.user_service import user_service
 
 logger = structlog.get_logger(__name__)
 
@@ -95,6 +96,17 @@ async def stripe_webhook(request: Request):
         raise HTTPException(status_code=500, detail=f"Webhook error: {str(e)}")
 
 
+async def invalidate_subscription_owner_profile(stripe_subscription_id: str):
+    """Descarta o perfil em cache (/auth/me) do dono da assinatura após alterá-la"""
+    owner = await execute_sql(
+        "SELECT user_id FROM subscriptions WHERE stripe_subscription_id = %s LIMIT 1",
+        (stripe_subscription_id,),
+        "scalar"
+    )
+    if owner.get("data"):
+        user_service.invalidate_profile(owner["data"])
+
+
 async def cancel_previous_subscriptions_webhook(customer_id: str, current_subscription_id: str):
     """
     Cancela todas as assinaturas anteriores do mesmo cliente (versão webhook)
@@ -152,6 +164,7 @@ async def cancel_previous_subscriptions_webhook(customer_id: str, current_subscr
                 logger.error(f"❌ [WEBHOOK] Erro ao cancelar assinatura {stripe_subscription_id}: {e}")
                 continue
         
+        user_service.invalidate_profile(user_id)
         logger.info(f"✅ [WEBHOOK] Processo de cancelamento de assinaturas anteriores concluído")
         
     except Exception as e:
@@ -244,6 +257,7 @@ async def handle_subscription_created(subscription):
             if insert_result["error"]:
                 logger.error(f"❌ Erro ao registrar assinatura: {insert_result['error']}")
             else:
+                user_service.invalidate_profile(user["id"])
                 logger.info(f"✅ Assinatura registrada no MariaDB: {subscription_id}")
         
     except Exception as e:
@@ -281,6 +295,7 @@ async def handle_subscription_updated(subscription):
         if update_result["error"]:
             logger.error(f"❌ Erro ao atualizar assinatura: {update_result['error']}")
         else:
+            await invalidate_subscription_owner_profile(subscription_id)
             logger.info(f"✅ Status da assinatura atualizado no MariaDB: {subscription_id}")
         
     except Exception as e:
@@ -314,6 +329,7 @@ async def handle_subscription_canceled(subscription):
             if cancel_result["error"]:
                 logger.error(f"❌ Erro ao cancelar assinatura: {cancel_result['error']}")
             else:
+                user_service.invalidate_profile(user["id"])
                 logger.info(f"✅ Assinatura cancelada no MariaDB: {subscription_id}")
             
             # Opcional: Enviar email de cancelamento
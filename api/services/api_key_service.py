@@ -11,9 +11,16 @@ from api.models.saas_models import (
     APIKeyCreate, APIKeyResponse, APIKeyList
 )
 from api.database.connection import execute_sql, generate_uuid
+from api.services.user_service import user_service
 
 logger = structlog.get_logger("api_key_service")
 
+
+def hash_api_key(key: str) -> str:
+    """Hash SHA-256 (hex) da API key visível, o valor guardado em api_keys.key_hash"""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
 class APIKeyService:
     def __init__(self):
         # Migrado de Supabase para MariaDB - não precisa de cliente específico
@@ -28,7 +35,7 @@ class APIKeyService:
         # Criar a chave visível com prefixo
         visible_key = f"rcp_{key_bytes.hex()}"
         # Gerar hash para armazenamento
-        key_hash = hashlib.sha256(visible_key.encode()).hexdigest()
+        key_hash = hash_api_key(visible_key)
         
         return visible_key, key_hash
     
@@ -58,10 +65,11 @@ class APIKeyService:
             description = key_data.description if key_data.description and key_data.description.strip() else None
             
             # Inserir nova API key
+            created_at = datetime.now()
             insert_result = await execute_sql("""
                 INSERT INTO api_keys 
                 (id, user_id, name, key_visible, key_hash, description, is_active, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """, (
                 api_key_id,
                 user_id,
@@ -69,37 +77,31 @@ class APIKeyService:
                 visible_key,  # Salvar chave visível inicialmente
                 key_hash,
                 description,
-                True
+                True,
+                created_at
             ), "none")
             
             if insert_result["error"]:
                 raise Exception(insert_result["error"])
             
-            # Buscar registro criado
-            created_result = await execute_sql(
-                "SELECT * FROM api_keys WHERE id = %s",
-                (api_key_id,),
-                "one"
-            )
+            # Contagem de API keys faz parte do perfil em cache
+            user_service.invalidate_profile(user_id)
             
-            if created_result["data"]:
-                api_key_data = created_result["data"]
-                return APIKeyResponse(
-                    id=api_key_data["id"],
-                    name=api_key_data["name"],
-                    description=api_key_data.get("description", ""),
-                    key=visible_key,  # Só retornado na criação
-                    key_hash=api_key_data["key_hash"],
-                    user_id=api_key_data["user_id"],
-                    created_at=api_key_data["created_at"],
-                    last_used=api_key_data.get("last_used_at"),
-                    is_active=api_key_data["is_active"]
-                )
-            else:
-                raise Exception("Falha ao buscar API key criada")
+            # Montar resposta a partir dos dados inseridos (sem SELECT adicional)
+            return APIKeyResponse(
+                id=api_key_id,
+                name=key_data.name,
+                description=description,
+                key=visible_key,  # Só retornado na criação
+                key_hash=key_hash,
+                user_id=user_id,
+                created_at=created_at,
+                last_used=None,
+                is_active=True
+            )
                 
         except Exception as e:
-            logger.error(f"Erro ao criar API key: {e}")
+            logger.error("erro_criar_api_key", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao criar API key: {str(e)}")
     
     async def get_user_api_keys(self, user_id: str) -> List[APIKeyList]:
@@ -132,7 +134,7 @@ class APIKeyService:
             return api_keys
             
         except Exception as e:
-            logger.error(f"Erro ao buscar API keys do usuário {user_id}: {e}")
+            logger.error("erro_buscar_api_keys", user_id=user_id, error=str(e))
             return []
     
     async def clear_visible_key_after_view(self, api_key_id: str, user_id: str) -> bool:
@@ -147,14 +149,14 @@ class APIKeyService:
             """, (api_key_id, user_id), "none")
             
             if result["error"]:
-                logger.error(f"Erro ao limpar chave visível {api_key_id}: {result['error']}")
+                logger.error("erro_limpar_chave_visivel", api_key_id=api_key_id, error=result["error"])
                 return False
                 
             # Retorna True se uma linha foi afetada (chave foi limpa)
             return result["count"] > 0
             
         except Exception as e:
-            logger.error(f"Erro ao limpar chave visível {api_key_id}: {e}")
+            logger.error("erro_limpar_chave_visivel", api_key_id=api_key_id, error=str(e))
             return False
     
     async def revoke_api_key(self, user_id: str, key_id: str) -> bool:
@@ -209,6 +211,8 @@ class APIKeyService:
                            error=revoke_result["error"])
                 return False
             
+            user_service.invalidate_profile(user_id)
+            
             logger.info("api_key_revogada_com_sucesso", 
                        user_id=user_id,
                        key_id=key_id)
@@ -236,7 +240,7 @@ class APIKeyService:
             return result["data"] if result["data"] else None
             
         except Exception as e:
-            logger.error(f"Erro ao buscar API key por hash: {e}")
+            logger.error("erro_buscar_api_key_por_hash", error=str(e))
             return None
     
     async def update_last_used(self, key_id: str) -> bool:
@@ -254,7 +258,7 @@ class APIKeyService:
             return not result["error"]
             
         except Exception as e:
-            logger.error(f"Erro ao atualizar último uso da API key {key_id}: {e}")
+            logger.error("erro_atualizar_ultimo_uso_api_key", key_id=key_id, error=str(e))
             return False
     
     async def get_keys_usage_v2(self, user_id: str) -> List[dict]:
@@ -190,6 +190,45 @@ class ConsultationTypesService:
                           fallback_cost=fallback_cost)
             return fallback_cost
     
+    async def get_costs_bulk(self, system_codes: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Obtém custos de vários tipos com uma única leitura dos tipos (cache/BD)
+        
+        Args:
+            system_codes: Códigos usados no sistema (ex: ['protestos', 'registrations'])
+            
+        Returns:
+            Dict[str, Optional[int]]: Custo em centavos por código do sistema
+        """
+        try:
+            types = await self.get_all_types()
+        except Exception as e:
+            logger.error("erro_obter_custos_bulk", 
+                        system_codes=system_codes, 
+                        error=str(e), 
+                        error_type=type(e).__name__)
+            types = {}
+        
+        costs = {}
+        for system_code in system_codes:
+            db_code = self._map_system_code_to_db_code(system_code)
+            if db_code in types:
+                costs[system_code] = types[db_code]["cost_cents"]
+                continue
+            
+            # Fallback para custo padrão
+            fallback_cost = self._fallback_costs.get(db_code, self._fallback_costs.get(system_code))
+            if fallback_cost:
+                logger.warning("usando_custo_fallback", 
+                              system_code=system_code, 
+                              db_code=db_code, 
+                              fallback_cost=fallback_cost)
+            else:
+                logger.error("custo_nao_encontrado", system_code=system_code, db_code=db_code)
+            costs[system_code] = fallback_cost
+        
+        return costs
+    
     async def get_type_by_code(self, system_code: str) -> Optional[Dict]:
         """
         Obtém informações completas de um tipo específico
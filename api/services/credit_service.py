@@ -11,6 +11,7 @@ import structlog
 from fastapi import HTTPException
 
 from api.database.connection import execute_sql, generate_uuid
+from api.services.user_service import user_service
 
 logger = structlog.get_logger(__name__)
 
@@ -72,7 +73,10 @@ async def add_user_credits(
         if result["error"]:
             raise HTTPException(status_code=500, detail=f"Erro ao inserir transação: {result['error']}")
         
-        logger.info(f"✅ Créditos adicionados: R$ {amount:.2f} para usuário {user_id}")
+        # Totais de créditos fazem parte do perfil em cache
+        user_service.invalidate_profile(user_id)
+        
+        logger.info("creditos_adicionados", user_id=user_id, amount=amount)
         
         # Buscar saldo atualizado (o trigger já atualizou users.credits)
         balance = await get_user_balance(user_id)
@@ -85,7 +89,7 @@ async def add_user_credits(
         }
             
     except Exception as e:
-        logger.error(f"❌ Erro ao adicionar créditos: {e}")
+        logger.error("erro_adicionar_creditos", user_id=user_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"Erro ao adicionar créditos: {str(e)}")
 
 
@@ -135,7 +139,10 @@ async def consume_credits(
         if result["error"]:
             raise HTTPException(status_code=500, detail=f"Erro ao registrar consumo: {result['error']}")
         
-        logger.info(f"💰 Créditos consumidos: R$ {amount:.2f} do usuário {user_id}")
+        # Totais de créditos fazem parte do perfil em cache
+        user_service.invalidate_profile(user_id)
+        
+        logger.info("creditos_consumidos", user_id=user_id, amount=amount)
         
         # Buscar saldo atualizado (o trigger já atualizou users.credits)
         new_balance = await get_user_balance(user_id)
@@ -152,7 +159,7 @@ async def consume_credits(
     except HTTPException:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
-        logger.error(f"❌ Erro ao consumir créditos: {e}")
+        logger.error("erro_consumir_creditos", user_id=user_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"Erro ao consumir créditos: {str(e)}")
 
 
@@ -163,22 +170,21 @@ async def get_user_balance(user_id: str) -> float:
     try:
         # Query SQL para buscar saldo do usuário
         sql = "SELECT credits FROM users WHERE id = %s"
-        result = await execute_sql(sql, (user_id,), "one")
+        result = await execute_sql(sql, (user_id,), "scalar")
         
         if result["error"]:
-            logger.error(f"❌ Erro SQL ao buscar créditos: {result['error']}")
+            logger.error("erro_sql_buscar_creditos", user_id=user_id, error=result["error"])
             return 0.0
         
-        if result["data"]:
-            credits = result["data"].get("credits", 0)
-            # Converter Decimal para float se necessário
-            return float(credits) if credits is not None else 0.0
+        if result["data"] is not None:
+            # Converter Decimal para float
+            return float(result["data"])
         else:
-            logger.warning(f"⚠️ Usuário {user_id} não encontrado para consulta de créditos")
+            logger.warning("usuario_nao_encontrado_creditos", user_id=user_id)
             return 0.0
             
     except Exception as e:
-        logger.error(f"❌ Erro ao buscar créditos do usuário {user_id}: {e}")
+        logger.error("erro_buscar_creditos", user_id=user_id, error=str(e))
         return 0.0
 
 
@@ -228,7 +234,7 @@ async def get_user_credit_summary(user_id: str) -> dict:
         }
         
     except Exception as e:
-        logger.error(f"❌ Erro ao buscar resumo de créditos: {e}")
+        logger.error("erro_buscar_resumo_creditos", user_id=user_id, error=str(e))
         return {
             "available": 0.0,
             "total_purchased": 0.0,
@@ -256,7 +262,7 @@ async def get_recent_credit_transactions(user_id: str, limit: int = 10) -> list:
         result = await execute_sql(sql, (user_id, limit), "all")
         
         if result["error"]:
-            logger.error(f"❌ Erro SQL ao buscar transações: {result['error']}")
+            logger.error("erro_sql_buscar_transacoes", user_id=user_id, error=result["error"])
             return []
         
         if result["data"]:
@@ -282,7 +288,7 @@ async def get_recent_credit_transactions(user_id: str, limit: int = 10) -> list:
             return []
             
     except Exception as e:
-        logger.error(f"❌ Erro ao buscar transações recentes: {e}")
+        logger.error("erro_buscar_transacoes_recentes", user_id=user_id, error=str(e))
         return []
 
 
@@ -294,7 +300,7 @@ async def validate_sufficient_credits(user_id: str, required_amount: float) -> b
         current_balance = await get_user_balance(user_id)
         return current_balance >= required_amount
     except Exception as e:
-        logger.error(f"❌ Erro ao validar créditos suficientes: {e}")
+        logger.error("erro_validar_creditos_suficientes", user_id=user_id, error=str(e))
         return False
 
 
@@ -335,11 +341,11 @@ async def get_consultation_cost(consultation_type: str) -> float:
             return cost_reais
         
         # Fallback para valor padrão se não encontrado
-        logger.warning(f"⚠️ Tipo de consulta não encontrado: {consultation_type}, usando custo padrão")
+        logger.warning("tipo_consulta_nao_encontrado_custo_padrao", consultation_type=consultation_type)
         return 0.03  # R$ 0,03 padrão
         
     except Exception as e:
-        logger.error(f"❌ Erro ao buscar custo de consulta: {e}")
+        logger.error("erro_buscar_custo_consulta", consultation_type=consultation_type, error=str(e))
         return 0.03  # R$ 0,03 como fallback seguro
 
 
@@ -359,7 +365,7 @@ async def _reload_consultation_costs_cache():
         result = await execute_sql(sql, (), "all")
         
         if result["error"]:
-            logger.error(f"❌ Erro SQL ao carregar custos: {result['error']}")
+            logger.error("erro_sql_carregar_custos", error=result["error"])
             return
         
         # Atualizar cache (converter centavos para reais)
@@ -371,10 +377,10 @@ async def _reload_consultation_costs_cache():
                 new_cache[code] = cost_reais
                 
             _consultation_costs_cache = new_cache
-            logger.info(f"✅ Cache de custos atualizado: {len(new_cache)} tipos carregados")
+            logger.info("cache_custos_atualizado", tipos=len(new_cache))
         
     except Exception as e:
-        logger.error(f"❌ Erro ao recarregar cache de custos: {e}")
+        logger.error("erro_recarregar_cache_custos", error=str(e))
 
 
 async def calculate_total_consultation_cost(consultation_types: list) -> float:
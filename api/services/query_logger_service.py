@@ -2,14 +2,38 @@
 Serviço para registrar consultas no histórico - Nova Estrutura v2.0
 MIGRADO: Supabase → MariaDB
 """
+import json
+import uuid
+import orjson
 import structlog
+from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import pytz
 from api.database.connection import execute_sql, generate_uuid
+from api.services.user_service import user_service
 
 logger = structlog.get_logger("query_logger_service")
 
+
+# datetime/date/time e dataclasses vão para default=str, como no json.dumps(default=str)
+# usado antes: o response_data gravado mantém o formato "YYYY-MM-DD HH:MM:SS"
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+def _dumps_json(value: Any) -> str:
+    """Serializa para JSON com orjson (UTF-8 direto, bem mais rápido que json.dumps)"""
+    try:
+        return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS).decode()
+    except orjson.JSONEncodeError:
+        # Casos que o orjson recusa (ex.: inteiros acima de 64 bits): json.dumps como antes
+        return json.dumps(value, default=str)
+
+
 class QueryLoggerService:
     def __init__(self):
         # Migrado de Supabase para MariaDB - não precisa de cliente específico
@@ -87,11 +111,10 @@ class QueryLoggerService:
             consultation_id = generate_uuid()
             
             # Converter response_data para JSON string se fornecido
-            import json
             response_data_json = None
             if response_data:
                 try:
-                    response_data_json = json.dumps(response_data, ensure_ascii=False, default=str)
+                    response_data_json = _dumps_json(response_data)
                 except Exception as json_error:
                     logger.warning("erro_serializar_response_data", 
                                  user_id=user_id, 
@@ -132,6 +155,9 @@ class QueryLoggerService:
             
             logger.info("consulta_principal_inserida", consultation_id=consultation_id)
             
+            # Nova consulta altera os contadores de uso do usuário
+            user_service.invalidate_stats(user_id)
+            
             # 2. Inserir detalhes por tipo de consulta
             details_success = await self._log_consultation_details(consultation_id, consultation_types)
             
@@ -173,8 +199,6 @@ class QueryLoggerService:
         Fallback para salvar consulta em arquivo quando Supabase não está disponível
         """
         try:
-            import json
-            from pathlib import Path
             
             log_dir = Path("logs/query_history")
             log_dir.mkdir(parents=True, exist_ok=True)
@@ -225,9 +249,8 @@ class QueryLoggerService:
                 """
                 
                 # Serializar JSON para string
-                import json
                 response_data = ct.get("response_data")
-                response_data_json = json.dumps(response_data) if response_data else None
+                response_data_json = _dumps_json(response_data) if response_data else None
                 
                 detail_params = (
                     detail_id,
@@ -284,7 +307,6 @@ class QueryLoggerService:
             return None
             
         try:
-            import uuid
             uuid.UUID(api_key_id)
             return api_key_id
         except ValueError:
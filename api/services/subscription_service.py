@@ -6,6 +6,7 @@ import structlog
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from api.database.connection import execute_sql
+from api.services.user_service import user_service
 
 logger = structlog.get_logger("subscription_service")
 
@@ -153,6 +154,8 @@ class SubscriptionService:
                         VALUES (%s, %s, %s, 'active', CURRENT_TIMESTAMP, DATE_ADD(CURRENT_TIMESTAMP, INTERVAL 1 MONTH))
                     """
                     await execute_sql(create_sql, (new_id, user_id, plan_id))
+                
+                user_service.invalidate_profile(user_id)
             
             logger.info("assinatura_alterada", user_id=user_id, plan_id=plan_id, action=action)
             
@@ -202,6 +205,7 @@ class SubscriptionService:
             """
             
             await execute_sql(cancel_sql, (user_id, subscription["id"]))
+            user_service.invalidate_profile(user_id)
             
             logger.info("assinatura_cancelada", user_id=user_id, subscription_id=subscription["id"])
             
@@ -255,6 +259,7 @@ class SubscriptionService:
             """
             
             await execute_sql(reactivate_sql, (user_id, subscription["id"]))
+            user_service.invalidate_profile(user_id)
             
             logger.info("assinatura_reativada", user_id=user_id, subscription_id=subscription["id"])
             
@@ -3,8 +3,10 @@ Serviço Unificado de Consulta
 Combina consultas de protestos (ScrapingService) e dados CNPJa
 """
 
+import asyncio
 import time
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
@@ -18,18 +20,168 @@ from api.services.scraping_service import ScrapingService
 from src.utils.cnpja_api import CNPJaAPI, CNPJaAPIError, CNPJaInvalidCNPJError, CNPJaNotFoundError
 from api.services.credit_service import credit_service, InsufficientCreditsError
 from api.services.consultation_types_service import consultation_types_service
+from src.config.settings import settings
 
 logger = structlog.get_logger(__name__)
 
+# Parâmetros CNPJa que, se presentes, dispensam o fallback para 'basic'/'strategy'
+_FALLBACK_KEYS = frozenset({'simples', 'registrations', 'geocoding', 'suframa'})
+
+# Custos padrão (centavos) usados quando o custo dinâmico não está disponível
+_COST_DEFAULTS = {
+    'protestos': 15,
+    'receita_federal': 5,
+    'simples_nacional': 5,
+    'registrations': 5,     # mapeado para cadastro_contribuintes no BD
+    'geocoding': 5,         # mapeado para geocodificacao no BD
+    'suframa': 5,
+}
+
+# Códigos de custo CNPJa, na ordem das flags avaliadas em _requested_cost_codes
+_CNPJA_COST_CODES = ('receita_federal', 'simples_nacional', 'registrations', 'geocoding', 'suframa')
+
+
+def _flags_key(request: ConsultationRequest) -> tuple:
+    """Tupla hashable com as flags do request que determinam os parâmetros CNPJa"""
+    return (
+        request.strategy,
+        request.simples,
+        request.geocoding,
+        request.suframa,
+        request.extract_basic,
+        request.extract_address,
+        request.extract_contact,
+        request.extract_activities,
+        request.extract_partners,
+        request.registrations,
+    )
+
+
+@lru_cache(maxsize=256)
+def _build_cnpja_params_cached(key: tuple) -> dict:
+    """
+    Constrói os parâmetros CNPJa a partir da tupla de flags (memoizado)
+    
+    Poucas combinações de flags se repetem no tráfego real; o dict é
+    construído uma vez por combinação. Não alterar o retorno diretamente.
+    """
+    (strategy, simples, geocoding, suframa, extract_basic, extract_address,
+     extract_contact, extract_activities, extract_partners, registrations) = key
+    
+    params = (
+        ('strategy', strategy),
+        ('simples', simples),
+        ('geocoding', geocoding),
+        ('suframa', suframa),
+        # Parâmetros de extração
+        ('basic', extract_basic),
+        ('address', extract_address),
+        ('contact', extract_contact),
+        ('activities', extract_activities),
+        ('partners', extract_partners),
+        # registrations só entra se especificado
+        ('registrations', registrations or None),
+    )
+    
+    # Filtrar parâmetros None e False desnecessários
+    # IMPORTANTE: Sempre manter pelo menos um parâmetro para garantir que a CNPJa retorne dados básicos
+    filtered_params = {k: v for k, v in params if v is not None and v is not False}
+    
+    # Se nenhum parâmetro específico foi incluído, garantir que pelo menos 'basic' e 'strategy' estejam presentes
+    if _FALLBACK_KEYS.isdisjoint(filtered_params):
+        filtered_params.setdefault('basic', True)
+        filtered_params.setdefault('strategy', 'CACHE_IF_FRESH')
+    
+    logger.debug("parametros_cnpja_construidos", params=filtered_params)
+    return filtered_params
+
+
+def _requested_cost_codes(request: ConsultationRequest) -> list:
+    """Códigos de custo cobrados pela consulta, conforme as flags do request"""
+    codes = ['protestos'] if request.protestos else []
+    
+    # Custos CNPJa (Receita Federal) - somente se receita_federal=true
+    if request.receita_federal:
+        flags = (
+            # Receita Federal básica: qualquer extração básica ativa
+            request.extract_basic or request.extract_address or request.extract_contact
+            or request.extract_activities or request.extract_partners,
+            request.simples,
+            request.registrations,
+            request.geocoding,
+            request.suframa,
+        )
+        codes.extend(code for flag, code in zip(flags, _CNPJA_COST_CODES) if flag)
+    
+    return codes
+
+
+async def _run_with_timeout(coro, timeout_s: float) -> tuple[bool, object]:
+    """
+    Executa a corrotina com timeout próprio
+    
+    Returns:
+        tuple: (True, resultado) ou (False, TimeoutError) - o timeout de uma
+        fonte não cancela as demais tarefas do TaskGroup
+    """
+    try:
+        async with asyncio.timeout(timeout_s):
+            return True, await coro
+    except TimeoutError as e:
+        return False, e
+
+
+def _task_result(task: asyncio.Task) -> tuple[bool, object]:
+    """
+    Resultado de uma tarefa de _run_with_timeout
+    
+    Returns:
+        tuple: (True, resultado), (False, TimeoutError) pelo timeout da própria fonte,
+        ou (False, None) quando a tarefa foi cancelada pelo timeout total
+    """
+    if task.done() and not task.cancelled():
+        return task.result()
+    return False, None
+
+
+def _timeout_message(fonte: str, source_timeout_s: float, result: object) -> str:
+    """Mensagem de timeout indicando qual limite estourou (o da fonte ou o total)"""
+    if result is None:
+        return f"Timeout total da consulta ({settings.CONSULTA_TIMEOUT_TOTAL_S}s) durante a consulta {fonte}"
+    return f"Timeout na consulta {fonte} ({source_timeout_s}s)"
+
 
 class UnifiedConsultationService:
     """Serviço que combina consultas de protestos e dados CNPJa"""
     
-    def __init__(self):
+    def __init__(self, scraping_service: Optional[ScrapingService] = None):
         """Inicializa o serviço unificado"""
-        self.scraping_service = None  # Será inicializado sob demanda
-        self.cnpja_api = None        # Será inicializado sob demanda
+        self.scraping_service = scraping_service  # Compartilhado pela app ou inicializado sob demanda
+        self.cnpja_api = None                     # Será inicializado sob demanda
+    
+    def set_scraping_service(self, scraping_service: ScrapingService) -> None:
+        """Reutiliza o ScrapingService global da aplicação (evita uma instância por consulta)"""
+        self.scraping_service = scraping_service
+    
+    def warmup(self) -> None:
+        """
+        Pré-inicializa os sub-serviços no startup da aplicação
+        
+        Garante que ScrapingService e CNPJaAPI sejam criados uma única vez,
+        antes das primeiras requisições concorrentes.
+        """
+        self._get_scraping_service()
+        try:
+            self._get_cnpja_api()
+        except CNPJaAPIError as e:
+            # Sem API key a CNPJa continua indisponível, mas não impede o startup
+            logger.warning("cnpja_api_nao_inicializada", error=str(e))
         
+    async def close(self) -> None:
+        """Libera as conexões HTTP mantidas pela CNPJa API"""
+        if self.cnpja_api is not None:
+            await self.cnpja_api.aclose()
+    
     def _get_scraping_service(self) -> ScrapingService:
         """Lazy initialization do ScrapingService"""
         if self.scraping_service is None:
@@ -57,11 +209,27 @@ class UnifiedConsultationService:
             ConsultationResponse: Resposta com dados segmentados
         """
         start_time = time.time()
+        
+        # Fast-path: nenhuma fonte solicitada - sem custo, sem créditos, sem consultas
+        if not request.protestos and not request.receita_federal:
+            logger.warning("consulta_vazia",
+                          cnpj=request.cnpj[:8] + "****",
+                          user_id=user_id)
+            return ConsultationResponse(
+                success=True,
+                cnpj=request.cnpj,
+                timestamp=datetime.now(),
+                user_id=user_id,
+                response_time_ms=int((time.time() - start_time) * 1000)
+            )
+        
         protestos_data = None
         cnpja_data = None
         cache_used = False
-        error_messages = []
+        error_messages = None    # Alocado só no caminho de erro
         consultation_types = []  # Lista de tipos consultados para logging
+        protestos_ms = None      # Sub-tempos anexados ao evento final
+        cnpja_ms = None
         
         logger.info("iniciando_consulta_unificada_v2", 
                    cnpj=request.cnpj[:8] + "****",
@@ -73,30 +241,34 @@ class UnifiedConsultationService:
                    geocoding=request.geocoding,
                    suframa=request.suframa)
         
-        # 1. Calcular custo total da consulta
-        total_cost_cents = await self._calculate_consultation_cost(request)
+        # 1/2. Calcular custo total e buscar saldo em paralelo
+        # O saldo não depende do custo: a comparação é feita localmente, sem
+        # uma segunda ida ao banco depois que o custo exato é conhecido
+        if user_id:
+            (total_cost_cents, costs), user_credits = await asyncio.gather(
+                self._calculate_consultation_cost(request),
+                credit_service.get_user_credits(user_id)
+            )
+        else:
+            total_cost_cents, costs = await self._calculate_consultation_cost(request)
         
-        logger.info("custo_calculado", 
+        logger.debug("custo_calculado", 
                    cnpj=request.cnpj[:8] + "****",
                    user_id=user_id,
                    total_cost_cents=total_cost_cents)
         
-        # 2. Verificar créditos e renovar se necessário
+        # 2. Verificar créditos suficientes
         if user_id:
             try:
                 # Converter centavos para reais
                 total_cost_reais = total_cost_cents / 100.0
-                # Validar se há créditos suficientes
-                has_credits = await credit_service.validate_sufficient_credits(user_id, total_cost_reais)
-                if not has_credits:
-                    # Buscar saldo atual para informar na exceção
-                    user_credits = await credit_service.get_user_credits(user_id)
-                    current_balance = user_credits.get("available", 0)
+                current_balance = user_credits.get("available", 0)
+                if current_balance < total_cost_reais:
                     raise InsufficientCreditsError(
                         current_balance=current_balance,
                         required_amount=total_cost_reais
                     )
-                logger.info("verificacao_creditos_ok", user_id=user_id, custo_reais=total_cost_reais)
+                logger.debug("verificacao_creditos_ok", user_id=user_id, custo_reais=total_cost_reais)
             except InsufficientCreditsError as e:
                 logger.error("creditos_insuficientes", user_id=user_id, error=str(e))
                 return ConsultationResponse(
@@ -108,102 +280,60 @@ class UnifiedConsultationService:
                     response_time_ms=int((time.time() - start_time) * 1000)
                 )
         
-        # 3. Consultar protestos se solicitado
-        if request.protestos:
-            consulta_start_time = time.time()
-            try:
-                scraping_service = self._get_scraping_service()
-                logger.info("consultando_protestos", cnpj=request.cnpj[:8] + "****")
-                
-                protestos_result = await scraping_service.consultar_cnpj(request.cnpj)
-                protestos_data = self._format_protestos_data(protestos_result)
-                
-                # Registrar tipo consultado com custo dinâmico
-                protestos_cost = await consultation_types_service.get_cost_by_code('protestos')
-                consultation_types.append({
+        # 3/4. Consultar protestos e CNPJa (somente se receita_federal=true) em paralelo,
+        # cada fonte com seu próprio timeout: uma fonte lenta não derruba a outra
+        cnpja_requested = request.receita_federal
+        protestos_task = None
+        cnpja_task = None
+        
+        try:
+            async with asyncio.timeout(settings.CONSULTA_TIMEOUT_TOTAL_S):
+                async with asyncio.TaskGroup() as tg:
+                    if request.protestos:
+                        protestos_task = tg.create_task(_run_with_timeout(
+                            self._consultar_protestos(request, costs), settings.PROTESTOS_TIMEOUT_S))
+                    if cnpja_requested:
+                        cnpja_task = tg.create_task(_run_with_timeout(
+                            self._consultar_cnpja(request), settings.CNPJA_TIMEOUT_S))
+        except TimeoutError:
+            logger.error("timeout_total_consulta_unificada",
+                        cnpj=request.cnpj[:8] + "****",
+                        timeout_s=settings.CONSULTA_TIMEOUT_TOTAL_S)
+        
+        if protestos_task is not None:
+            ok, result = _task_result(protestos_task)
+            if ok:
+                protestos_data, protestos_type, error_msg = result
+            else:
+                protestos_data = None
+                error_msg = _timeout_message("de protestos", settings.PROTESTOS_TIMEOUT_S, result)
+                protestos_type = {
                     "type_code": "protestos",
-                    "cost_cents": protestos_cost or 15,
-                    "success": True,
-                    "response_time_ms": int((time.time() - consulta_start_time) * 1000),
-                    "cache_used": False,
-                    "response_data": protestos_data
-                })
-                
-                logger.info("consulta_protestos_sucesso", 
-                           cnpj=request.cnpj[:8] + "****",
-                           tem_protestos=bool(protestos_data.get('cenprotProtestos')))
-                
-            except Exception as e:
-                error_msg = f"Erro na consulta de protestos: {str(e)}"
-                error_messages.append(error_msg)
-                
-                # Registrar tipo com erro - usar custo dinâmico
-                protestos_cost = await consultation_types_service.get_cost_by_code('protestos')
-                consultation_types.append({
-                    "type_code": "protestos", 
-                    "cost_cents": protestos_cost or 15,
+                    "cost_cents": costs.get('protestos') or _COST_DEFAULTS['protestos'],
                     "success": False,
-                    "response_time_ms": int((time.time() - consulta_start_time) * 1000),
+                    "response_time_ms": int((time.time() - start_time) * 1000),
                     "error_message": error_msg
-                })
-                
-                logger.error("erro_consulta_protestos", 
-                           cnpj=request.cnpj[:8] + "****", 
-                           error=str(e),
-                           error_type=type(e).__name__)
-        
-        # 4. Consultar dados CNPJa somente se receita_federal=true
-        cnpja_requested = request.receita_federal
-        
-        if cnpja_requested:
-            try:
-                cnpja_api = self._get_cnpja_api()
-                cnpja_params = self._build_cnpja_params(request)
-                
-                logger.info("consultando_cnpja", 
-                           cnpj=request.cnpj[:8] + "****",
-                           params=cnpja_params)
-                
-                cnpja_result = cnpja_api.get_all_company_info(request.cnpj, **cnpja_params)
-                cnpja_data = cnpja_result
-                
-                # Cache usado baseado na estratégia solicitada
-                cache_used = request.strategy == 'CACHE_IF_FRESH'
-                
-                logger.info("consulta_cnpja_sucesso", 
-                           cnpj=request.cnpj[:8] + "****",
-                           cache_usado=cache_used,
-                           categorias_retornadas=list(cnpja_result.keys()) if cnpja_result else [])
-                
-            except CNPJaInvalidCNPJError as e:
-                error_msg = f"CNPJ inválido: {str(e)}"
-                error_messages.append(error_msg)
-                logger.warning("cnpj_invalido_cnpja", 
-                              cnpj=request.cnpj[:8] + "****", 
-                              error=str(e))
-                
-            except CNPJaNotFoundError as e:
-                error_msg = f"CNPJ não encontrado na base da Receita: {str(e)}"
+                }
+                logger.error("timeout_consulta_protestos", cnpj=request.cnpj[:8] + "****", timeout_total=result is None)
+            protestos_ms = protestos_type["response_time_ms"]
+            consultation_types.append(protestos_type)
+            if error_msg:
+                if error_messages is None:
+                    error_messages = []
                 error_messages.append(error_msg)
-                logger.warning("cnpj_nao_encontrado_cnpja", 
-                              cnpj=request.cnpj[:8] + "****", 
-                              error=str(e))
-                
-            except CNPJaAPIError as e:
-                error_msg = f"Erro na API CNPJa: {str(e)}"
-                error_messages.append(error_msg)
-                logger.error("erro_consulta_cnpja", 
-                           cnpj=request.cnpj[:8] + "****", 
-                           error=str(e),
-                           error_type=type(e).__name__)
-                
-            except Exception as e:
-                error_msg = f"Erro inesperado na consulta CNPJa: {str(e)}"
+        
+        if cnpja_task is not None:
+            ok, result = _task_result(cnpja_task)
+            if ok:
+                cnpja_data, cache_used, error_msg, cnpja_ms = result
+            else:
+                error_msg = _timeout_message("CNPJa", settings.CNPJA_TIMEOUT_S, result)
+                cnpja_ms = int((time.time() - start_time) * 1000)
+                logger.error("timeout_consulta_cnpja", cnpj=request.cnpj[:8] + "****", timeout_total=result is None)
+            if error_msg:
+                if error_messages is None:
+                    error_messages = []
                 error_messages.append(error_msg)
-                logger.error("erro_inesperado_cnpja", 
-                           cnpj=request.cnpj[:8] + "****", 
-                           error=str(e),
-                           error_type=type(e).__name__)
         
         # 3. Calcular estatísticas de protestos
         total_protests, has_protests = self._calculate_protest_stats(protestos_data)
@@ -211,22 +341,18 @@ class UnifiedConsultationService:
         
         # 4. Determinar sucesso geral
         # Consulta é considerada bem-sucedida se pelo menos uma fonte retornou dados
-        # ou se nenhuma fonte foi solicitada (caso edge)
+        # (o caso sem nenhuma fonte solicitada já retornou no início)
         success = (
             (request.protestos and protestos_data is not None) or
-            (cnpja_requested and cnpja_data is not None) or
-            (not request.protestos and not cnpja_requested)
+            (cnpja_requested and cnpja_data is not None)
         )
         
         # 5. O campo 'data' agora será automaticamente preenchido com a data/hora da consulta
         
-        # 6. Preparar mensagem de erro final
+        # 6. Preparar mensagem de erro final (join só no caminho de falha)
         final_error = None
         if not success:
-            if error_messages:
-                final_error = " | ".join(error_messages)
-            else:
-                final_error = "Nenhuma fonte de dados retornou resultados"
+            final_error = " | ".join(error_messages) if error_messages else "Nenhuma fonte de dados retornou resultados"
         
         logger.info("consulta_unificada_finalizada",
                    cnpj=request.cnpj[:8] + "****",
@@ -234,9 +360,16 @@ class UnifiedConsultationService:
                    success=success,
                    response_time_ms=response_time,
                    cache_usado=cache_used,
-                   total_protestos=total_protests)
+                   total_protestos=total_protests,
+                   protestos_ms=protestos_ms,
+                   protestos_ok=protestos_data is not None if request.protestos else None,
+                   cnpja_ms=cnpja_ms,
+                   cnpja_ok=cnpja_data is not None if cnpja_requested else None,
+                   errors=error_messages)
         
-        return ConsultationResponse(
+        # model_construct: campos já validados/derivados aqui - evita revalidar
+        # protestos/dados_receita (payloads grandes) a cada consulta
+        return ConsultationResponse.model_construct(
             success=success,
             cnpj=request.cnpj,
             timestamp=datetime.now(),
@@ -250,6 +383,111 @@ class UnifiedConsultationService:
             # Campo 'data' será preenchido automaticamente com datetime.now()
         )
     
+    async def _consultar_protestos(self, request: ConsultationRequest, costs: dict) -> tuple[Optional[dict], dict, Optional[str]]:
+        """
+        Consulta protestos e monta o registro do tipo consultado
+        
+        Returns:
+            tuple: (protestos_data, consultation_type, mensagem de erro ou None)
+        """
+        consulta_start_time = time.time()
+        try:
+            scraping_service = self._get_scraping_service()
+            logger.debug("consultando_protestos", cnpj=request.cnpj[:8] + "****")
+            
+            protestos_result = await scraping_service.consultar_cnpj(request.cnpj)
+            protestos_data = self._format_protestos_data(protestos_result)
+            
+            logger.debug("consulta_protestos_sucesso", 
+                        cnpj=request.cnpj[:8] + "****",
+                        tem_protestos=bool(protestos_data.get('cenprotProtestos')))
+            
+            # Registrar tipo consultado com o custo já calculado
+            return protestos_data, {
+                "type_code": "protestos",
+                "cost_cents": costs.get('protestos') or _COST_DEFAULTS['protestos'],
+                "success": True,
+                "response_time_ms": int((time.time() - consulta_start_time) * 1000),
+                "cache_used": False,
+                "response_data": protestos_data
+            }, None
+            
+        except Exception as e:
+            error_msg = f"Erro na consulta de protestos: {str(e)}"
+            logger.error("erro_consulta_protestos", 
+                        cnpj=request.cnpj[:8] + "****", 
+                        error=str(e),
+                        error_type=type(e).__name__)
+            
+            # Registrar tipo com erro - reutilizar custo já calculado (sem nova ida ao banco)
+            return None, {
+                "type_code": "protestos", 
+                "cost_cents": costs.get('protestos') or _COST_DEFAULTS['protestos'],
+                "success": False,
+                "response_time_ms": int((time.time() - consulta_start_time) * 1000),
+                "error_message": error_msg
+            }, error_msg
+    
+    async def _consultar_cnpja(self, request: ConsultationRequest) -> tuple[Optional[dict], bool, Optional[str], int]:
+        """
+        Consulta dados da Receita Federal via CNPJa
+        
+        Returns:
+            tuple: (cnpja_data, cache_used, mensagem de erro ou None, tempo em ms)
+        """
+        cnpja_start_time = time.time()
+        cnpja_data = None
+        cache_used = False
+        error_msg = None
+        try:
+            cnpja_api = self._get_cnpja_api()
+            cnpja_params = self._build_cnpja_params(request)
+            
+            logger.debug("consultando_cnpja", 
+                        cnpj=request.cnpj[:8] + "****",
+                        params=cnpja_params)
+            
+            # A espera na fila do rate limit conta dentro de CNPJA_TIMEOUT_S: sobra tempo
+            # para a própria requisição, e fila cheia vira erro de limite, não timeout
+            max_wait = max(0.0, settings.CNPJA_TIMEOUT_S - cnpja_api.HTTP_TIMEOUT_S)
+            cnpja_data = await cnpja_api.get_all_company_info_async(request.cnpj, max_wait=max_wait, **cnpja_params)
+            
+            # Cache usado baseado na estratégia solicitada
+            cache_used = request.strategy == 'CACHE_IF_FRESH'
+            
+            logger.debug("consulta_cnpja_sucesso", 
+                        cnpj=request.cnpj[:8] + "****",
+                        cache_usado=cache_used,
+                        categorias_retornadas=list(cnpja_data.keys()) if cnpja_data else [])
+            
+        except CNPJaInvalidCNPJError as e:
+            error_msg = f"CNPJ inválido: {str(e)}"
+            logger.warning("cnpj_invalido_cnpja", 
+                          cnpj=request.cnpj[:8] + "****", 
+                          error=str(e))
+            
+        except CNPJaNotFoundError as e:
+            error_msg = f"CNPJ não encontrado na base da Receita: {str(e)}"
+            logger.warning("cnpj_nao_encontrado_cnpja", 
+                          cnpj=request.cnpj[:8] + "****", 
+                          error=str(e))
+            
+        except CNPJaAPIError as e:
+            error_msg = f"Erro na API CNPJa: {str(e)}"
+            logger.error("erro_consulta_cnpja", 
+                        cnpj=request.cnpj[:8] + "****", 
+                        error=str(e),
+                        error_type=type(e).__name__)
+            
+        except Exception as e:
+            error_msg = f"Erro inesperado na consulta CNPJa: {str(e)}"
+            logger.error("erro_inesperado_cnpja", 
+                        cnpj=request.cnpj[:8] + "****", 
+                        error=str(e),
+                        error_type=type(e).__name__)
+        
+        return cnpja_data, cache_used, error_msg, int((time.time() - cnpja_start_time) * 1000)
+    
     def _format_protestos_data(self, protestos_result) -> Optional[dict]:
         """
         Formata dados de protestos para estrutura consistente
@@ -302,39 +540,8 @@ class UnifiedConsultationService:
         Returns:
             dict: Parâmetros formatados para CNPJa API
         """
-        params = {
-            'strategy': request.strategy,
-            'simples': request.simples,
-            'geocoding': request.geocoding,
-            'suframa': request.suframa,
-            # Parâmetros de extração
-            'basic': request.extract_basic,
-            'address': request.extract_address,
-            'contact': request.extract_contact,
-            'activities': request.extract_activities,
-            'partners': request.extract_partners
-        }
-        
-        # Adicionar registrations se especificado
-        if request.registrations:
-            params['registrations'] = request.registrations
-        
-        # Filtrar parâmetros None e False desnecessários
-        # IMPORTANTE: Sempre manter pelo menos um parâmetro para garantir que a CNPJa retorne dados básicos
-        filtered_params = {}
-        for key, value in params.items():
-            if value is not None and value is not False:
-                filtered_params[key] = value
-        
-        # Se nenhum parâmetro específico foi incluído, garantir que pelo menos 'basic' e 'strategy' estejam presentes
-        if not any(k in filtered_params for k in ['simples', 'registrations', 'geocoding', 'suframa']):
-            if 'basic' not in filtered_params:
-                filtered_params['basic'] = True
-            if 'strategy' not in filtered_params:
-                filtered_params['strategy'] = 'CACHE_IF_FRESH'
-        
-        logger.debug("parametros_cnpja_construidos", params=filtered_params)
-        return filtered_params
+        # Cópia rasa: o dict em cache não pode ser alterado pelos chamadores
+        return dict(_build_cnpja_params_cached(_flags_key(request)))
     
     def _calculate_protest_stats(self, protestos_data: Optional[dict]) -> tuple[Optional[int], Optional[bool]]:
         """
@@ -381,44 +588,22 @@ class UnifiedConsultationService:
                         protestos_data_type=type(protestos_data).__name__)
             return None, None
     
-    async def _calculate_consultation_cost(self, request: ConsultationRequest) -> int:
+    async def _calculate_consultation_cost(self, request: ConsultationRequest) -> tuple[int, dict]:
         """
         Calcula o custo total da consulta baseado nos tipos solicitados
         Usa dados dinâmicos da tabela consultation_types
-        """
-        total_cost = 0
         
-        # Protestos: buscar custo dinamicamente
-        if request.protestos:
-            protestos_cost = await consultation_types_service.get_cost_by_code('protestos')
-            total_cost += protestos_cost or 15  # fallback de segurança
+        Returns:
+            tuple: (custo total em centavos, custos por código consultado)
+        """
+        # Custos buscados dinamicamente (uma única leitura do cache de tipos),
+        # com fallback de segurança em _COST_DEFAULTS
+        costs = await consultation_types_service.get_costs_bulk(_requested_cost_codes(request))
         
-        # Custos CNPJa (Receita Federal) - somente se receita_federal=true
-        if request.receita_federal:
-            # CNPJa - Receita Federal básica: buscar custo dinâmico
-            if (request.extract_basic or request.extract_address or 
-                request.extract_contact or request.extract_activities or request.extract_partners):
-                receita_cost = await consultation_types_service.get_cost_by_code('receita_federal')
-                total_cost += receita_cost or 5  # fallback
-            
-            # CNPJa - Simples Nacional: buscar custo dinâmico
-            if request.simples:
-                simples_cost = await consultation_types_service.get_cost_by_code('simples_nacional')
-                total_cost += simples_cost or 5  # fallback
-                
-            # CNPJa - Cadastro de contribuintes: buscar custo dinâmico (mapeamento registrations -> cadastro_contribuintes)
-            if request.registrations:
-                registrations_cost = await consultation_types_service.get_cost_by_code('registrations')
-                total_cost += registrations_cost or 5  # fallback
-                
-            # CNPJa - Geocodificação: buscar custo dinâmico (mapeamento geocoding -> geocodificacao)
-            if request.geocoding:
-                geocoding_cost = await consultation_types_service.get_cost_by_code('geocoding')
-                total_cost += geocoding_cost or 5  # fallback
-                
-            # CNPJa - Suframa: buscar custo dinâmico
-            if request.suframa:
-                suframa_cost = await consultation_types_service.get_cost_by_code('suframa')
-                total_cost += suframa_cost or 5  # fallback
+        total_cost = sum(cost or _COST_DEFAULTS[code] for code, cost in costs.items())
         
-        return total_cost
+        return total_cost, costs
+
+
+# Instância global do serviço
+unified_consultation_service = UnifiedConsultationService()
@@ -2,10 +2,14 @@
 Serviço de gerenciamento de usuários para o SaaS
 MIGRADO: Supabase → MariaDB
 """
-import os
-from typing import Optional, List
-from datetime import datetime, timedelta
+import time
+import asyncio
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Optional
+from datetime import datetime
 import structlog
+from passlib.context import CryptContext
 from api.models.saas_models import (
     UserCreate, UserResponse, SubscriptionPlan, SubscriptionStatus,
     ProfileUpdateRequest, UserProfileResponse, ChangePasswordRequest
@@ -14,10 +18,113 @@ from api.database.connection import execute_sql, generate_uuid
 
 logger = structlog.get_logger("user_service")
 
+# Contexto bcrypt único (também usado no login/registro em api/routers/auth.py)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Configurações de notificação padrão (por enquanto não persistidas)
+DEFAULT_NOTIFICATION_SETTINGS = MappingProxyType({
+    "email_notifications": True,
+    "api_alerts": True,
+    "billing_alerts": True,
+    "credits_alerts": True,
+    "renewal_alerts": True,
+    "security_alerts": True,
+    "marketing_emails": False
+})
+
+# UPDATE de update_profile por combinação (nome?, email?) de campos enviados
+_UPDATE_PROFILE_SQL = {
+    (True, False): "UPDATE users SET name = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+    (False, True): "UPDATE users SET email = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+    (True, True): "UPDATE users SET name = %s, email = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+}
+
+# ER_DUP_ENTRY do MySQL/MariaDB (violação de índice UNIQUE)
+DUPLICATE_ENTRY_ERROR = 1062
+
+
+async def hash_password(password: str) -> str:
+    """Gera hash bcrypt em thread separada (o KDF é lento por design e bloquearia o event loop)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, pwd_context.hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """Verifica senha contra hash bcrypt em thread separada"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, pwd_context.verify, password, password_hash)
+
+
+class _TTLCache:
+    """Cache local LRU com expiração por entrada (processo único, sem dependências)"""
+    __slots__ = ("_data", "_ttl_seconds", "_maxsize")
+    
+    def __init__(self, ttl_seconds: float, maxsize: int = 10_000):
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._ttl_seconds = ttl_seconds
+        self._maxsize = maxsize
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna valor do cache se ainda dentro do TTL"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Armazena valor no cache, descartando o menos usado se cheio"""
+        self._data[key] = (time.monotonic() + self._ttl_seconds, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: str) -> None:
+        """Remove entrada do cache"""
+        self._data.pop(key, None)
+
+
 class UserService:
+    __slots__ = ("_user_cache", "_user_inflight", "_stats_cache", "_profile_cache")
+    
     def __init__(self):
         # Migrado de Supabase para MariaDB - não precisa de cliente específico
-        pass
+        # Cache local de get_user, invalidado nas escritas do usuário
+        self._user_cache = _TTLCache(ttl_seconds=60)
+        self._user_inflight: dict[str, "asyncio.Future[Optional[UserResponse]]"] = {}
+        # Cache curto de get_user_usage_stats (polling do dashboard),
+        # invalidado quando uma nova consulta é registrada
+        self._stats_cache = _TTLCache(ttl_seconds=15)
+        # Cache de get_user_complete_profile (/auth/me), invalidado nas escritas
+        # do usuário (inclusive login), em novas consultas, em movimentações de
+        # créditos, em API keys e em escritas de subscriptions (Stripe/planos)
+        self._profile_cache = _TTLCache(ttl_seconds=30)
+    
+    def invalidate_user_cache(self, user_id: str) -> None:
+        """Remove usuário do cache (chamar após qualquer escrita em users)"""
+        self._user_cache.pop(user_id)
+        self._user_inflight.pop(user_id, None)
+        self._profile_cache.pop(user_id)
+    
+    def _clear_inflight(self, user_id: str, task: "asyncio.Future[Optional[UserResponse]]") -> None:
+        """Remove a busca concluída, sem descartar uma mais recente do mesmo usuário"""
+        if self._user_inflight.get(user_id) is task:
+            del self._user_inflight[user_id]
+    
+    def invalidate_stats(self, user_id: str) -> None:
+        """Remove estatísticas e perfil do cache (chamar após inserir em consultations)"""
+        self._stats_cache.pop(user_id)
+        self._profile_cache.pop(user_id)
+    
+    def invalidate_profile(self, user_id: str) -> None:
+        """Remove perfil completo do cache (créditos, API keys, assinatura ou último login alterados)"""
+        self._profile_cache.pop(user_id)
     
     async def create_user(self, user_data: UserCreate) -> UserResponse:
         """
@@ -25,22 +132,11 @@ class UserService:
         MIGRADO: Supabase → MariaDB
         """
         try:
-            # Verificar se email já existe
-            existing_result = await execute_sql(
-                "SELECT id FROM users WHERE email = %s LIMIT 1",
-                (user_data.email,),
-                "one"
-            )
-            
-            if existing_result["data"]:
-                raise Exception("Email já está em uso")
-            
             # Criar usuário no MariaDB
             user_id = generate_uuid()
             
-            # Hash da senha (implementar bcrypt se necessário)
-            import hashlib
-            password_hash = hashlib.sha256(user_data.password.encode()).hexdigest()
+            # Hash da senha com bcrypt (compatível com o login)
+            password_hash = await hash_password(user_data.password)
             
             insert_sql = """
                 INSERT INTO users 
@@ -48,43 +144,37 @@ class UserService:
                 VALUES (%s, %s, %s, %s, %s, %s)
             """
             
+            created_at = datetime.now()
             insert_params = (
                 user_id,
                 user_data.email,
                 user_data.full_name,
                 password_hash,
                 True,
-                datetime.now().isoformat()
+                created_at
             )
             
             result = await execute_sql(insert_sql, insert_params, "none")
             
             if result["error"]:
+                # Unicidade garantida pelo índice unique_email (sem SELECT prévio)
+                if result.get("error_code") == DUPLICATE_ENTRY_ERROR:
+                    raise Exception("Email já está em uso")
                 raise Exception(f"Falha ao criar usuário: {result['error']}")
             
-            # Buscar usuário criado
-            created_result = await execute_sql(
-                "SELECT * FROM users WHERE id = %s LIMIT 1",
-                (user_id,),
-                "one"
+            # Montar resposta a partir dos dados inseridos (sem SELECT adicional)
+            return UserResponse(
+                id=user_id,
+                email=user_data.email,
+                full_name=user_data.full_name,
+                company="Valida SaaS",  # Valor padrão
+                created_at=created_at,
+                subscription_plan=SubscriptionPlan.PRO,
+                subscription_status=SubscriptionStatus.ACTIVE
             )
-            
-            if created_result["data"]:
-                user_profile = created_result["data"]
-                return UserResponse(
-                    id=user_profile["id"],
-                    email=user_profile["email"],
-                    full_name=user_profile["name"],
-                    company="Valida SaaS",  # Valor padrão
-                    created_at=datetime.fromisoformat(user_profile["created_at"].replace('Z', '+00:00') if 'Z' in str(user_profile["created_at"]) else str(user_profile["created_at"])),
-                    subscription_plan=SubscriptionPlan.PRO,
-                    subscription_status=SubscriptionStatus.ACTIVE
-                )
-            else:
-                raise Exception("Falha ao buscar usuário criado")
                 
         except Exception as e:
-            logger.error(f"Erro ao criar usuário MariaDB: {e}")
+            logger.error("erro_criar_usuario", email=user_data.email, error=str(e))
             raise Exception(f"Erro ao criar usuário: {str(e)}")
     
     async def get_user(self, user_id: str) -> Optional[UserResponse]:
@@ -92,153 +182,130 @@ class UserService:
         Obtém um usuário pelo ID
         MIGRADO: MariaDB
         """
+        cached_user = self._user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+        
+        # Single-flight: misses concorrentes do mesmo usuário aguardam uma única consulta
+        fetch_task = self._user_inflight.get(user_id)
+        if fetch_task is None:
+            fetch_task = asyncio.ensure_future(self._fetch_user(user_id))
+            self._user_inflight[user_id] = fetch_task
+            fetch_task.add_done_callback(lambda task: self._clear_inflight(user_id, task))
+        
+        # shield: cancelar uma requisição não cancela a busca compartilhada
+        return await asyncio.shield(fetch_task)
+    
+    async def _fetch_user(self, user_id: str) -> Optional[UserResponse]:
+        """Busca usuário no MariaDB e popula o cache"""
         try:
             result = await execute_sql(
-                "SELECT * FROM users WHERE id = %s",
+                "SELECT id, email, name, created_at FROM users WHERE id = %s",
                 (user_id,),
                 "one"
             )
             
             if result["data"]:
                 user_data = result["data"]
-                return UserResponse(
+                # Linha confiável do banco (colunas tipadas): dispensa validação Pydantic
+                user = UserResponse.model_construct(
                     id=user_data["id"],
                     email=user_data["email"],
-                    full_name=user_data.get("name", "Usuário"),  # Usar 'name' em vez de 'full_name'
-                    company=user_data.get("company", "N/A"),  # Campo opcional
-                    created_at=datetime.fromisoformat(user_data["created_at"].replace('Z', '+00:00') if 'Z' in str(user_data["created_at"]) else str(user_data["created_at"])),
+                    full_name=user_data["name"] or "Usuário",  # Usar 'name' em vez de 'full_name'
+                    company="N/A",  # Coluna inexistente em users
+                    created_at=user_data["created_at"],
                     subscription_plan=SubscriptionPlan.PRO,  # Valor padrão
                     subscription_status=SubscriptionStatus.ACTIVE  # Valor padrão
                 )
+                # Só popula o cache se não houve invalidação durante a consulta
+                if self._user_inflight.get(user_id) is asyncio.current_task():
+                    self._user_cache.set(user_id, user)
+                return user
             return None
             
         except Exception as e:
-            logger.error(f"Erro ao buscar usuário {user_id}: {e}")
+            logger.error("erro_buscar_usuario", user_id=user_id, error=str(e))
             return None
     
     async def get_user_complete_profile(self, user_id: str) -> Optional[UserProfileResponse]:
         """
         Obtém perfil completo do usuário com estatísticas e configurações
         """
+        cached_profile = self._profile_cache.get(user_id)
+        if cached_profile is not None:
+            return cached_profile
+        
         try:
-            # Query simplificada para testar
-            main_sql = """
+            # Perfil, agregados (tabela user_stats) e assinatura em uma única ida ao banco
+            profile_sql = """
                 SELECT 
-                    u.id, u.name, u.email, u.created_at, u.last_login, u.credits, u.credit_alert_threshold_cents
+                    u.id, u.name, u.email, u.created_at, u.last_login, u.credits, u.credit_alert_threshold_cents,
+                    COALESCE(us.credits_purchased_cents, 0) / 100.0 as total_purchased,
+                    COALESCE(us.credits_spent_cents, 0) / 100.0 as total_spent,
+                    COALESCE(us.total_queries, 0) as total_queries,
+                    (SELECT COUNT(*) FROM consultations c
+                       WHERE c.user_id = u.id AND c.created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)) as monthly_queries,
+                    us.last_query_date,
+                    COALESCE(us.api_keys_count, 0) as api_keys_count,
+                    s.status as subscription_status,
+                    sp.name as subscription_plan,
+                    DATEDIFF(NOW(), s.created_at) as subscription_days
                 FROM users u
+                LEFT JOIN user_stats us ON us.user_id = u.id
+                LEFT JOIN subscriptions s ON s.user_id = u.id AND s.status = 'active'
+                LEFT JOIN subscription_plans sp ON sp.id = s.plan_id
                 WHERE u.id = %s
+                ORDER BY s.created_at DESC
+                LIMIT 1
             """
             
-            result = await execute_sql(main_sql, (user_id,), "one")
+            result = await execute_sql(profile_sql, (user_id,), "one")
             
             if not result["data"]:
-                logger.error(f"Usuário {user_id} não encontrado")
+                logger.error("usuario_nao_encontrado", user_id=user_id)
                 return None
             
             user_data = result["data"]
+            has_subscription = user_data["subscription_status"] is not None
             
-            # Query para estatísticas de créditos
-            credits_sql = """
-                SELECT 
-                    SUM(CASE WHEN type IN ('add', 'purchase') THEN amount_cents ELSE 0 END) / 100.0 as total_purchased,
-                    SUM(CASE WHEN type IN ('subtract', 'spend', 'usage') THEN amount_cents ELSE 0 END) / 100.0 as total_spent
-                FROM credit_transactions 
-                WHERE user_id = %s
-            """
-            
-            credits_result = await execute_sql(credits_sql, (user_id,), "one")
-            credits_data = credits_result["data"] or {"total_purchased": 0.0, "total_spent": 0.0}
-            
-            # Query para estatísticas de consultas
-            queries_sql = """
-                SELECT 
-                    COUNT(*) as total_queries,
-                    COUNT(CASE WHEN created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY) THEN 1 END) as monthly_queries,
-                    MAX(created_at) as last_query_date
-                FROM consultations 
-                WHERE user_id = %s
-            """
-            
-            queries_result = await execute_sql(queries_sql, (user_id,), "one")
-            queries_data = queries_result["data"] or {"total_queries": 0, "monthly_queries": 0, "last_query_date": None}
-            
-            # Query para API keys
-            api_keys_sql = """
-                SELECT COUNT(*) as api_keys_count
-                FROM api_keys 
-                WHERE user_id = %s AND is_active = 1
-            """
-            
-            api_keys_result = await execute_sql(api_keys_sql, (user_id,), "one")
-            api_keys_count = api_keys_result["data"]["api_keys_count"] if api_keys_result["data"] else 0
-            
-            # Query para dados de assinatura
-            subscription_sql = """
-                SELECT 
-                    s.status as subscription_status,
-                    sp.name as subscription_plan,
-                    sp.code as plan_code,
-                    s.created_at as subscription_start,
-                    s.current_period_start,
-                    s.current_period_end,
-                    DATEDIFF(NOW(), s.created_at) as subscription_days
-                FROM subscriptions s
-                JOIN subscription_plans sp ON s.plan_id = sp.id
-                WHERE s.user_id = %s AND s.status = 'active'
-                ORDER BY s.created_at DESC
-                LIMIT 1
-            """
-            
-            subscription_result = await execute_sql(subscription_sql, (user_id,), "one")
-            subscription_data = subscription_result["data"] if subscription_result["data"] else None
-            
-            # Configurações de notificação padrão (por enquanto)
-            notification_settings = {
-                "email_notifications": True,
-                "api_alerts": True,
-                "billing_alerts": True,
-                "credits_alerts": True,
-                "renewal_alerts": True,
-                "security_alerts": True,
-                "marketing_emails": False
-            }
-            
-            return UserProfileResponse(
+            profile = UserProfileResponse(
                 # Dados básicos
                 id=user_data["id"],
                 name=user_data["name"],
                 email=user_data["email"],
-                created_at=datetime.fromisoformat(user_data["created_at"].replace('Z', '+00:00') if 'Z' in str(user_data["created_at"]) else str(user_data["created_at"])),
-                last_login=datetime.fromisoformat(user_data["last_login"].replace('Z', '+00:00') if user_data["last_login"] and 'Z' in str(user_data["last_login"]) else str(user_data["last_login"])) if user_data["last_login"] else None,
+                created_at=user_data["created_at"],
+                last_login=user_data["last_login"],
                 
                 # Estatísticas de créditos
                 credits_available=float(user_data["credits"] or 0.0),
-                credits_used_total=float(credits_data["total_spent"]),
-                credits_purchased_total=float(credits_data["total_purchased"]),
+                credits_used_total=float(user_data["total_spent"]),
+                credits_purchased_total=float(user_data["total_purchased"]),
                 
                 # Estatísticas de consultas
-                monthly_queries=queries_data["monthly_queries"] or 0,
-                total_queries=queries_data["total_queries"] or 0,
-                last_query_date=datetime.fromisoformat(queries_data["last_query_date"].replace('Z', '+00:00') if queries_data["last_query_date"] and 'Z' in str(queries_data["last_query_date"]) else str(queries_data["last_query_date"])) if queries_data["last_query_date"] else None,
+                monthly_queries=user_data["monthly_queries"] or 0,
+                total_queries=user_data["total_queries"] or 0,
+                last_query_date=user_data["last_query_date"],
                 
                 # Configurações
-                notification_settings=notification_settings,
+                notification_settings=dict(DEFAULT_NOTIFICATION_SETTINGS),
                 credit_alert_threshold=user_data.get("credit_alert_threshold_cents", 500),
                 
                 # Status da assinatura
-                subscription_status=subscription_data["subscription_status"] if subscription_data else "inactive",
-                subscription_plan=subscription_data["subscription_plan"] if subscription_data else "Free",
-                subscription_days=subscription_data["subscription_days"] if subscription_data else 0,
+                subscription_status=user_data["subscription_status"] if has_subscription else "inactive",
+                subscription_plan=user_data["subscription_plan"] if has_subscription else "Free",
+                subscription_days=user_data["subscription_days"] if has_subscription else 0,
                 
                 # Informações de segurança
                 two_factor_enabled=False,  # Por enquanto sempre False
                 
                 # Contagem de API keys
-                api_keys_count=api_keys_count
+                api_keys_count=user_data["api_keys_count"]
             )
+            self._profile_cache.set(user_id, profile)
+            return profile
             
         except Exception as e:
-            logger.error(f"Erro ao buscar perfil completo do usuário {user_id}: {e}")
+            logger.error("erro_buscar_perfil_completo", user_id=user_id, error=str(e))
             return None
     
     async def update_profile(self, user_id: str, profile_data: ProfileUpdateRequest) -> bool:
@@ -246,47 +313,36 @@ class UserService:
         Atualiza dados do perfil do usuário
         """
         try:
-            update_fields = []
-            params = []
-            
-            if profile_data.name is not None:
-                update_fields.append("name = %s")
-                params.append(profile_data.name)
-            
-            if profile_data.email is not None:
-                # Verificar se email já existe
-                existing_result = await execute_sql(
-                    "SELECT id FROM users WHERE email = %s AND id != %s LIMIT 1",
-                    (profile_data.email, user_id),
-                    "one"
-                )
-                
-                if existing_result["data"]:
-                    raise Exception("Email já está em uso por outro usuário")
-                
-                update_fields.append("email = %s")
-                params.append(profile_data.email)
+            has_name = profile_data.name is not None
+            has_email = profile_data.email is not None
             
-            if not update_fields:
+            if not (has_name or has_email):
                 return True  # Nada para atualizar
             
-            update_fields.append("updated_at = %s")
-            params.append(datetime.now().isoformat())
-            params.append(user_id)
-            
-            sql = f"UPDATE users SET {', '.join(update_fields)} WHERE id = %s"
+            sql = _UPDATE_PROFILE_SQL[(has_name, has_email)]
+            if has_name and has_email:
+                params = (profile_data.name, profile_data.email, user_id)
+            elif has_name:
+                params = (profile_data.name, user_id)
+            else:
+                params = (profile_data.email, user_id)
             
-            result = await execute_sql(sql, tuple(params), "none")
+            result = await execute_sql(sql, params, "none")
             
             if result["error"]:
-                logger.error(f"Erro ao atualizar perfil: {result['error']}")
+                # Unicidade do email garantida pelo índice unique_email
+                if result.get("error_code") == DUPLICATE_ENTRY_ERROR:
+                    logger.warning("email_em_uso_por_outro_usuario", user_id=user_id)
+                    return False
+                logger.error("erro_atualizar_perfil", user_id=user_id, error=result["error"])
                 return False
             
-            logger.info(f"Perfil atualizado para usuário {user_id}")
+            self.invalidate_user_cache(user_id)
+            logger.info("perfil_atualizado", user_id=user_id)
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao atualizar perfil do usuário {user_id}: {e}")
+            logger.error("erro_atualizar_perfil", user_id=user_id, error=str(e))
             return False
     
     async def change_password(self, user_id: str, current_password: str, new_password: str) -> bool:
@@ -307,31 +363,34 @@ class UserService:
             current_hash = user_result["data"]["password_hash"]
             
             # Verificar senha atual usando bcrypt
-            from passlib.context import CryptContext
-            pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-            
-            if not pwd_context.verify(current_password, current_hash):
+            if not await verify_password(current_password, current_hash):
                 raise Exception("Senha atual incorreta")
             
             # Gerar novo hash da senha usando bcrypt
-            new_password_hash = pwd_context.hash(new_password)
+            new_password_hash = await hash_password(new_password)
             
-            # Atualizar senha
+            # Atualizar senha só se o hash lido ainda for o atual (compare-and-swap:
+            # fecha a corrida com outra troca/reset sem segurar lock durante o bcrypt)
             result = await execute_sql(
-                "UPDATE users SET password_hash = %s, updated_at = %s WHERE id = %s",
-                (new_password_hash, datetime.now().isoformat(), user_id),
+                "UPDATE users SET password_hash = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s AND password_hash = %s",
+                (new_password_hash, user_id, current_hash),
                 "none"
             )
             
             if result["error"]:
-                logger.error(f"Erro ao alterar senha: {result['error']}")
+                logger.error("erro_alterar_senha", user_id=user_id, error=result["error"])
                 return False
             
-            logger.info(f"Senha alterada para usuário {user_id}")
+            if result["count"] == 0:
+                logger.warning("senha_alterada_concorrentemente", user_id=user_id)
+                return False
+            
+            self.invalidate_user_cache(user_id)
+            logger.info("senha_alterada", user_id=user_id)
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao alterar senha do usuário {user_id}: {e}")
+            logger.error("erro_alterar_senha", user_id=user_id, error=str(e))
             return False
 
     async def update_user_subscription(
@@ -348,24 +407,25 @@ class UserService:
             # Atualizar assinatura ativa do usuário na tabela subscriptions
             update_sql = """
                 UPDATE subscriptions 
-                SET status = %s, updated_at = %s
+                SET status = %s, updated_at = CURRENT_TIMESTAMP
                 WHERE user_id = %s AND status = 'active'
             """
             
             result = await execute_sql(
                 update_sql, 
-                (status.value.lower(), datetime.now().isoformat(), user_id), 
+                (status.value.lower(), user_id), 
                 "none"
             )
             
             if result["error"]:
-                logger.error(f"Erro ao atualizar assinatura MariaDB {user_id}: {result['error']}")
+                logger.error("erro_atualizar_assinatura", user_id=user_id, error=result["error"])
                 return False
             
+            self.invalidate_user_cache(user_id)
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao atualizar assinatura MariaDB {user_id}: {e}")
+            logger.error("erro_atualizar_assinatura", user_id=user_id, error=str(e))
             return False
     
     async def get_user_usage_stats(self, user_id: str) -> dict:
@@ -373,16 +433,22 @@ class UserService:
         Obtém estatísticas de uso do usuário
         MIGRADO: MariaDB
         """
+        cached_stats = self._stats_cache.get(user_id)
+        if cached_stats is not None:
+            return dict(cached_stats)
+        
         try:
             # Buscar estatísticas da tabela consultations
-            today = datetime.now().date()
-            current_month = today.replace(day=1)
+            # Limites como datetime (comparação direta em created_at usa o índice;
+            # DATE(created_at) impediria o range scan)
+            today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+            month_start = today_start.replace(day=1)
             
             stats_sql = """
                 SELECT 
                     COUNT(*) as total_requests,
-                    SUM(CASE WHEN DATE(created_at) >= %s THEN 1 ELSE 0 END) as requests_this_month,
-                    SUM(CASE WHEN DATE(created_at) = %s THEN 1 ELSE 0 END) as requests_today,
+                    SUM(created_at >= %s) as requests_this_month,
+                    SUM(created_at >= %s) as requests_today,
                     SUM(total_cost_cents) as total_cost_cents
                 FROM consultations 
                 WHERE user_id = %s
@@ -390,7 +456,7 @@ class UserService:
             
             result = await execute_sql(
                 stats_sql, 
-                (current_month.isoformat(), today.isoformat(), user_id), 
+                (month_start, today_start, user_id), 
                 "one"
             )
             
@@ -406,7 +472,7 @@ class UserService:
             
             data = result["data"]
             
-            return {
+            stats = {
                 "total_requests": data["total_requests"] or 0,
                 "requests_this_month": data["requests_this_month"] or 0,
                 "requests_today": data["requests_today"] or 0,
@@ -414,9 +480,11 @@ class UserService:
                 "remaining_requests": None,
                 "total_cost": f"R$ {(data['total_cost_cents'] or 0) / 100:.2f}"
             }
+            self._stats_cache.set(user_id, dict(stats))
+            return stats
             
         except Exception as e:
-            logger.error(f"Erro ao buscar estatísticas MariaDB {user_id}: {e}")
+            logger.error("erro_buscar_estatisticas", user_id=user_id, error=str(e))
             return {
                 "total_requests": 0,
                 "requests_this_month": 0,
@@ -432,45 +500,57 @@ class UserService:
         MIGRADO: MariaDB
         """
         try:
+            # created_at não muda: reaproveitar do cache quando disponível
+            cached_user = self._user_cache.get(user_id)
+            
             # Atualizar perfil no MariaDB
             update_sql = """
                 UPDATE users 
-                SET name = %s, email = %s, last_login = %s
+                SET name = %s, email = %s, last_login = CURRENT_TIMESTAMP
                 WHERE id = %s
             """
             
             result = await execute_sql(
                 update_sql,
-                (name, email, datetime.now().isoformat(), user_id),
+                (name, email, user_id),
                 "none"
             )
             
             if result["error"]:
+                if result.get("error_code") == DUPLICATE_ENTRY_ERROR:
+                    raise Exception("Email já está em uso por outro usuário")
                 raise Exception(f"Falha ao atualizar perfil: {result['error']}")
             
-            # Buscar dados atualizados
-            user_result = await execute_sql(
-                "SELECT * FROM users WHERE id = %s LIMIT 1",
-                (user_id,),
-                "one"
-            )
+            self.invalidate_user_cache(user_id)
             
-            if user_result["data"]:
-                user_data = user_result["data"]
-                return UserResponse(
-                    id=user_data["id"],
-                    email=user_data["email"],
-                    full_name=user_data["name"],
-                    company="Valida SaaS",  # Valor padrão
-                    created_at=datetime.fromisoformat(user_data["created_at"].replace('Z', '+00:00') if 'Z' in str(user_data["created_at"]) else str(user_data["created_at"])),
-                    subscription_plan=SubscriptionPlan.PRO,
-                    subscription_status=SubscriptionStatus.ACTIVE
-                )
+            if cached_user is not None:
+                created_at = cached_user.created_at
             else:
-                raise Exception("Usuário não encontrado após atualização")
+                # Sem cache: buscar apenas created_at (o restante vem dos parâmetros)
+                user_result = await execute_sql(
+                    "SELECT created_at FROM users WHERE id = %s LIMIT 1",
+                    (user_id,),
+                    "scalar"
+                )
+                
+                if user_result["data"] is None:
+                    raise Exception("Usuário não encontrado após atualização")
+                
+                created_at = user_result["data"]
+            
+            # Montar resposta a partir dos valores gravados
+            return UserResponse(
+                id=user_id,
+                email=email,
+                full_name=name,
+                company="Valida SaaS",  # Valor padrão
+                created_at=created_at,
+                subscription_plan=SubscriptionPlan.PRO,
+                subscription_status=SubscriptionStatus.ACTIVE
+            )
                 
         except Exception as e:
-            logger.error(f"Erro ao atualizar perfil MariaDB {user_id}: {e}")
+            logger.error("erro_atualizar_perfil", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao atualizar perfil: {str(e)}")
     
     async def update_credit_alert_threshold(self, user_id: str, threshold_cents: int) -> bool:
@@ -479,20 +559,21 @@ class UserService:
         """
         try:
             result = await execute_sql(
-                "UPDATE users SET credit_alert_threshold_cents = %s, updated_at = %s WHERE id = %s",
-                (threshold_cents, datetime.now().isoformat(), user_id),
+                "UPDATE users SET credit_alert_threshold_cents = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+                (threshold_cents, user_id),
                 "none"
             )
             
             if result["error"]:
-                logger.error(f"Erro ao atualizar limite de alerta: {result['error']}")
+                logger.error("erro_atualizar_limite_alerta", user_id=user_id, error=result["error"])
                 return False
             
-            logger.info(f"Limite de alerta atualizado para usuário {user_id}: {threshold_cents} centavos")
+            self.invalidate_user_cache(user_id)
+            logger.info("limite_alerta_atualizado", user_id=user_id, threshold_cents=threshold_cents)
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao atualizar limite de alerta do usuário {user_id}: {e}")
+            logger.error("erro_atualizar_limite_alerta", user_id=user_id, error=str(e))
             return False
 
     async def enable_2fa(self, user_id: str) -> dict:
@@ -508,7 +589,7 @@ class UserService:
             }
             
         except Exception as e:
-            logger.error(f"Erro ao ativar 2FA {user_id}: {e}")
+            logger.error("erro_ativar_2fa", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao ativar 2FA: {str(e)}")
     
     async def disable_2fa(self, user_id: str) -> dict:
@@ -522,17 +603,19 @@ class UserService:
             }
             
         except Exception as e:
-            logger.error(f"Erro ao desativar 2FA {user_id}: {e}")
+            logger.error("erro_desativar_2fa", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao desativar 2FA: {str(e)}")
     
     async def update_notification_settings(self, user_id: str, settings: dict) -> dict:
         """
         Atualiza configurações de notificação do usuário
         TODO: Implementar campo notification_settings na tabela users
+        (ao persistir, usar UPDATE ... WHERE notification_settings <> %s para não
+        regravar nem invalidar cache quando nada mudou)
         """
         try:
             # Por enquanto, apenas simular sucesso
-            logger.info(f"Configurações de notificação atualizadas para {user_id}", extra={"settings": settings})
+            logger.info("notificacoes_atualizadas", user_id=user_id, settings=settings)
             
             return {
                 "success": True,
@@ -541,7 +624,7 @@ class UserService:
             }
                 
         except Exception as e:
-            logger.error(f"Erro ao atualizar notificações {user_id}: {e}")
+            logger.error("erro_atualizar_notificacoes", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao atualizar notificações: {str(e)}")
     
     async def upload_avatar(self, user_id: str, avatar_data: bytes) -> str:
@@ -554,7 +637,7 @@ class UserService:
             raise Exception("Upload de avatar não implementado ainda")
             
         except Exception as e:
-            logger.error(f"Erro ao fazer upload avatar {user_id}: {e}")
+            logger.error("erro_upload_avatar", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao fazer upload do avatar: {str(e)}")
     
     async def delete_account(self, user_id: str) -> dict:
@@ -565,21 +648,23 @@ class UserService:
         try:
             # Marcar usuário como inativo (soft delete)
             result = await execute_sql(
-                "UPDATE users SET is_active = FALSE, last_login = %s WHERE id = %s",
-                (datetime.now().isoformat(), user_id),
+                "UPDATE users SET is_active = FALSE, last_login = CURRENT_TIMESTAMP WHERE id = %s",
+                (user_id,),
                 "none"
             )
             
             if result["error"]:
                 raise Exception(f"Falha ao excluir conta: {result['error']}")
             
+            self.invalidate_user_cache(user_id)
+            
             return {
                 "success": True,
                 "message": "Conta excluída com sucesso"
             }
                 
         except Exception as e:
-            logger.error(f"Erro ao excluir conta MariaDB {user_id}: {e}")
+            logger.error("erro_excluir_conta", user_id=user_id, error=str(e))
             raise Exception(f"Erro ao excluir conta: {str(e)}")
 
 # Instância global do serviço
@@ -3,15 +3,22 @@
 #!/usr/bin/python3.11.9
 # ! pip install python-dotenv
 
-import pandas as pd #type: ignore
-import cx_Oracle #type: ignore
+from __future__ import annotations
+
+import oracledb #type: ignore
 from dotenv import load_dotenv #type: ignore
 import os
 import sys
 import base64
+import threading
+import time
 from pathlib import Path
 import logging
-from typing import Dict, List, Any, Optional, Union
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, List, Any, Iterator, Optional, Union
+
+if TYPE_CHECKING:
+    import pandas as pd  # type: ignore  # importado sob demanda nos métodos (import pesado)
 
 # Garantir que o diretório de logs existe antes de configurar o logger
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -26,21 +33,129 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+# Logger dedicado aos SQLs com erro (oracle-error.log), arquivo aberto uma vez na importação
+error_logger = logging.getLogger(f'{__name__}.errors')
+error_handler = logging.FileHandler(log_path / 'oracle-error.log', encoding='utf-8')
+error_handler.setFormatter(logging.Formatter('%(message)s'))
+error_logger.addHandler(error_handler)
+error_logger.setLevel(logging.ERROR)
+error_logger.propagate = False
+
+
+# Conversores por coluna em select(), escolhidos uma vez a partir de cursor.description
+def _conv_lob(value):
+    return value.read() if value is not None else None
+
+
+def _conv_str(value):
+    return str(value)
+
+
+def _pick_converter(oracle_type):
+    """Retorna o conversor da coluna (None = valor usado como veio do driver)"""
+    if oracle_type in (oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_NCLOB, oracledb.DB_TYPE_BLOB):
+        return _conv_lob
+    if oracle_type is oracledb.DB_TYPE_NUMBER:
+        # int/float já vêm do driver; a inferência fica com o pandas
+        return None
+    return _conv_str
+
+
+# Tipos aceitos nos parâmetros de saída de executar_bloco_pl_sql ('out:tipo');
+# tipos desconhecidos viram VARCHAR2
+_OUT_TYPE_MAP = {
+    'NUMBER': oracledb.DB_TYPE_NUMBER,
+    'STRING': oracledb.DB_TYPE_VARCHAR,
+    'VARCHAR2': oracledb.DB_TYPE_VARCHAR,
+    'DATE': oracledb.DB_TYPE_DATE,
+    'CURSOR': oracledb.DB_TYPE_CURSOR,
+}
+
 
 class OracleDatabase:
     _client_initialized = False  # Atributo de classe para rastrear a inicialização
+    _pool = None  # ConnectionPool compartilhado por todas as instâncias do processo
+    _pool_lock = threading.Lock()
 
-    def __init__(self):
+    # Preenchidos uma única vez em initialize_client
+    _username = None
+    _password = None
+    _dsn = None
+    _log_path = None
+
+    # Tamanho do pool de sessões
+    POOL_MIN = 4
+    POOL_MAX = 8
+    POOL_INCREMENT = 1
+    # Cache de statements por conexão: blocos PL/SQL/SQL repetidos não são reparseados
+    POOL_STMTCACHESIZE = 50
+
+    def __init__(self, arraysize: Optional[int] = None, prefetchrows: Optional[int] = None):
         self.initialize_client()  # Inicializa o cliente Oracle se ainda não foi feito
 
-        # Carregar credenciais do banco de dados a partir das variáveis de ambiente
-        # Compatível com múltiplas configurações de projeto
-        import os
-        from dotenv import load_dotenv
-        
-        # Carregar .env se disponível
-        load_dotenv()
-        
+        # Linhas por ida ao banco nos fetches (padrão do driver é 100);
+        # prefetchrows deve ser maior que arraysize
+        self.arraysize = arraysize or int(os.environ.get('ORACLE_ARRAYSIZE', '5000'))
+        self.prefetchrows = prefetchrows or int(os.environ.get('ORACLE_PREFETCHROWS', str(self.arraysize + 1)))
+
+        # Credenciais, DSN e diretório de logs resolvidos uma vez por processo
+        cls = type(self)
+        self.username = cls._username
+        self.password = cls._password
+        self.dsn_tns = cls._dsn
+        self.log_path = cls._log_path
+
+    @classmethod
+    def initialize_client(cls):
+        if not cls._client_initialized:  # Verifica se o cliente já foi inicializado
+            # Carregar .env uma vez por processo, antes de ler ORACLE_THICK_MODE
+            # (pode estar definido só no .env) e as credenciais
+            load_dotenv()
+            
+            # Por padrão o python-oracledb roda em modo thin (protocolo nativo, sem Instant Client).
+            # ORACLE_THICK_MODE=1 mantém o modo thick para bancos anteriores ao 12.1.
+            if os.environ.get('ORACLE_THICK_MODE', '').lower() in ('1', 'true', 'yes'):
+                try:
+                    # Detectar se está rodando como executável PyInstaller
+                    if getattr(sys, 'frozen', False):
+                        # Executável PyInstaller
+                        base_path = Path(sys._MEIPASS)
+                        instantclient_path = base_path / 'instantclient_19_18'
+                    else:
+                        # Desenvolvimento local
+                        if os.name == 'nt':  # Windows
+                            instantclient_path = Path(r'C:\src\instantclient_19_18')
+                        else:  # Linux (Docker)
+                            instantclient_path = Path(r'/opt/oracle/instantclient_19_18')
+                
+                    # Verificar se o diretório existe
+                    if not instantclient_path.exists():
+                        raise FileNotFoundError(f"Instant Client não encontrado em: {instantclient_path}")
+                
+                    # Inicializar o cliente Oracle (modo thick)
+                    oracledb.init_oracle_client(lib_dir=str(instantclient_path))
+                    logger.info(f"Cliente Oracle (thick) inicializado com sucesso em: {instantclient_path}")
+                except oracledb.Error as error:
+                    logger.error(f"Falha na inicialização do cliente Oracle: {error}")
+                    raise
+                except FileNotFoundError as error:
+                    logger.error(f"Instant Client não encontrado: {error}")
+                    raise
+            cls._client_initialized = True  # Marca como inicializado
+
+        if cls._dsn is None:
+            cls._username, cls._password = cls.load_credentials()
+            # Dados de conexão com Oracle
+            cls._dsn = oracledb.makedsn('192.33.0.3', '1521', service_name='WINT')
+            # Diretório de logs relativo à raiz do projeto (criado na importação do módulo)
+            cls._log_path = log_path
+
+    @staticmethod
+    def load_credentials():
+        """
+        Carrega DB_USER/DB_PASSWORD do ambiente (senha em base64 ou texto puro, conforme
+        DB_PASSWORD_ENCODING). O .env já foi carregado por initialize_client.
+        """
         # Obter credenciais do ambiente
         db_user = os.environ.get('DB_USER', '')
         db_password = os.environ.get('DB_PASSWORD', '')
@@ -48,130 +163,180 @@ class OracleDatabase:
         if not db_user or not db_password:
             raise ValueError("Credenciais DB_USER e DB_PASSWORD devem estar definidas nas variáveis de ambiente")
         
-        self.username = db_user
-        # Decodificar senha se estiver em base64
-        try:
-            decoded_bytes = base64.b64decode(db_password)
-            self.password = decoded_bytes.decode('utf-8')
-        except Exception:
-            # Se não conseguir decodificar como base64, usa a string diretamente
-            self.password = db_password
-
-        # Dados de conexão com Oracle
-        self.dsn_tns = cx_Oracle.makedsn('192.33.0.3', '1521', service_name='WINT')
-        
-        # Define o diretório de logs relativo à raiz do projeto
-        ROOT_DIR = Path(__file__).resolve().parent.parent
-        self.log_path = Path(ROOT_DIR) / 'log' / 'bd'
-        self.log_path.mkdir(parents=True, exist_ok=True)
+        # Codificação da senha declarada explicitamente (sem tentativa de decodificar)
+        encoding = os.environ.get('DB_PASSWORD_ENCODING', 'base64').strip().lower()
+        if encoding == 'base64':
+            password = base64.b64decode(db_password).decode('utf-8')
+        elif encoding == 'plain':
+            password = db_password
+        else:
+            raise ValueError("DB_PASSWORD_ENCODING deve ser 'base64' ou 'plain'")
 
-    @classmethod
-    def initialize_client(cls):
-        if not cls._client_initialized:  # Verifica se o cliente já foi inicializado
-            try:
-                # Detectar se está rodando como executável PyInstaller
-                if getattr(sys, 'frozen', False):
-                    # Executável PyInstaller
-                    base_path = Path(sys._MEIPASS)
-                    instantclient_path = base_path / 'instantclient_19_18'
-                else:
-                    # Desenvolvimento local
-                    if os.name == 'nt':  # Windows
-                        instantclient_path = Path(r'C:\src\instantclient_19_18')
-                    else:  # Linux (Docker)
-                        instantclient_path = Path(r'/opt/oracle/instantclient_19_18')
-                
-                # Verificar se o diretório existe
-                if not instantclient_path.exists():
-                    raise FileNotFoundError(f"Instant Client não encontrado em: {instantclient_path}")
-                
-                # Inicializar o cliente Oracle
-                cx_Oracle.init_oracle_client(lib_dir=str(instantclient_path))
-                cls._client_initialized = True  # Marca como inicializado
-                logger.info(f"Cliente Oracle inicializado com sucesso em: {instantclient_path}")
-            except cx_Oracle.Error as error:
-                logger.error(f"Falha na inicialização do cliente Oracle: {error}")
-                raise
-            except FileNotFoundError as error:
-                logger.error(f"Instant Client não encontrado: {error}")
-                raise
+        return db_user, password
+
+    def _get_pool(self):
+        """Retorna o pool de conexões do processo, criando-o na primeira chamada"""
+        cls = type(self)
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = oracledb.create_pool(
+                        user=self.username,
+                        password=self.password,
+                        dsn=self.dsn_tns,
+                        min=cls.POOL_MIN,
+                        max=cls.POOL_MAX,
+                        increment=cls.POOL_INCREMENT,
+                        homogeneous=True,
+                        getmode=oracledb.POOL_GETMODE_WAIT,
+                        stmtcachesize=cls.POOL_STMTCACHESIZE
+                    )
+                    logger.info(f"Pool de sessões Oracle criado (min={cls.POOL_MIN}, max={cls.POOL_MAX})")
+        return cls._pool
 
     def get_connection(self):
-        """Retorna uma nova conexão com o banco de dados Oracle"""
+        """Retorna uma conexão do pool de sessões Oracle (devolver com release_connection)"""
         try:
-            connection = cx_Oracle.connect(
-                user=self.username,
-                password=self.password,
-                dsn=self.dsn_tns,
-                encoding="UTF-8"
-            )
-            # Configurar conexão para commit automático
+            connection = self._get_pool().acquire()
+            # Configurar conexão para commit manual
             connection.autocommit = False
             return connection
-        except cx_Oracle.Error as error:
+        except oracledb.Error as error:
             self.log_error("Falha ao conectar ao banco de dados", error)
             raise
 
+    def release_connection(self, connection) -> None:
+        """Devolve a conexão ao pool (em vez de fechar a sessão)"""
+        self._get_pool().release(connection)
+
     # FUNÇÃO PARA EXECUTAR CONSULTAS SQL
     def select(self, sql: str) -> pd.DataFrame:
+        import pandas as pd  # type: ignore
+        
         connection = None
         cursor = None
         try:
             connection = self.get_connection()
             # Usar cursor de dicionário para facilitar o processamento
             cursor = connection.cursor()
+            cursor.arraysize = self.arraysize
+            cursor.prefetchrows = self.prefetchrows
             cursor.execute(sql)
             
-            # Obter nomes das colunas e convertê-los para minúsculo
-            columns = [col[0].lower() for col in cursor.description]
+            # Nomes das colunas (em minúsculo) e conversores, numa passada pela descrição
+            columns, converters = self._describe(cursor)
+            cols = self._fetch_columns(cursor, converters)
             
-            # Mapear tipos de dados Oracle para Python
-            oracle_types = [col[1] for col in cursor.description]
+            # Criar DataFrame coluna a coluna (colunas em lowercase)
+            df = self._build_frame(cols, columns)
             
-            # Processar resultados para garantir que sejam compatíveis com pandas
-            processed_rows = []
-            for row in cursor.fetchall():
-                processed_row = []
-                for i, item in enumerate(row):
-                    # Converter LOBs e outros tipos complexos em strings
-                    if isinstance(item, cx_Oracle.LOB):
-                        processed_row.append(item.read())
-                    # Converter valores numéricos
-                    elif oracle_types[i] in [cx_Oracle.DB_TYPE_NUMBER, cx_Oracle.NUMBER]:
-                        if item is not None:
-                            # Tentar converter para int ou float conforme necessário
-                            try:
-                                # Se for um número inteiro, converter para int
-                                if float(item).is_integer():
-                                    processed_row.append(int(item))
-                                else:
-                                    processed_row.append(float(item))
-                            except:
-                                processed_row.append(item)
-                        else:
-                            processed_row.append(item)
-                    elif hasattr(item, '__str__'):
-                        processed_row.append(str(item))
-                    else:
-                        processed_row.append(item)
-                processed_rows.append(processed_row)
+            return df
+        except Exception as error:
+            self.log_error(sql, error)
+            return pd.DataFrame()
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                self.release_connection(connection)
+
+    # FUNÇÃO PARA CONSULTAS SQL COM RESULTADO EM ARROW
+    def select_arrow(self, sql: str, as_pandas: bool = False):
+        """
+        Executa a consulta e retorna um pyarrow.Table (ou DataFrame, se as_pandas=True).
+        O pyarrow infere o tipo de cada coluna de uma vez, sem a inferência
+        por objeto do construtor do DataFrame. Requer o pacote pyarrow.
+        """
+        import pyarrow as pa  # type: ignore  # dependência opcional, só usada aqui
+        
+        connection = None
+        cursor = None
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            cursor.arraysize = self.arraysize
+            cursor.prefetchrows = self.prefetchrows
+            cursor.execute(sql)
             
-            # Criar DataFrame com os dados processados
-            # Usando lowercase para todas as colunas
-            df = pd.DataFrame(processed_rows, columns=columns)
+            columns, converters = self._describe(cursor)
+            cols = self._fetch_columns(cursor, converters)
+            table = pa.Table.from_arrays([pa.array(col) for col in cols], names=columns)
+            return table.to_pandas(self_destruct=True) if as_pandas else table
+        except Exception as error:
+            self.log_error(sql, error)
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                self.release_connection(connection)
+
+    @staticmethod
+    def _describe(cursor) -> tuple:
+        """Nomes das colunas em minúsculo e o conversor de cada uma, numa única passada"""
+        columns = []
+        converters = []
+        for col in cursor.description:
+            columns.append(col[0].lower())
+            converters.append(_pick_converter(col[1]))
+        return columns, converters
+
+    @staticmethod
+    def _fetch_columns(cursor, converters: list) -> List[list]:
+        """Lê o cursor em lotes de arraysize e acumula os valores convertidos por coluna"""
+        getters = [itemgetter(i) for i in range(len(converters))]
+        
+        # LOBs são lidos ainda dentro do lote, antes do próximo fetch
+        cols = [[] for _ in converters]
+        for batch in iter(lambda: cursor.fetchmany(cursor.arraysize), []):
+            for col, get, conv in zip(cols, getters, converters):
+                values = map(get, batch)
+                col.extend(map(conv, values) if conv else values)
+        return cols
+
+    # FUNÇÃO PARA CONSULTAS GRANDES, EM LOTES
+    def select_chunks(self, sql: str, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Executa a consulta e gera um DataFrame por lote de até chunk_rows linhas,
+        sem manter o resultado inteiro em memória. A conexão fica presa ao gerador
+        até ele ser consumido ou fechado.
+        """
+        connection = None
+        cursor = None
+        chunk_rows = chunk_rows or self.arraysize
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            cursor.arraysize = chunk_rows
+            cursor.prefetchrows = chunk_rows + 1
+            cursor.execute(sql)
             
-            # O método itertuples() do pandas já permite acesso por atributo
-            # Não é necessário fazer mais nada, o pandas lidará com isso corretamente
+            columns, converters = self._describe(cursor)
+            getters = [itemgetter(i) for i in range(len(columns))]
             
-            return df
+            for batch in iter(lambda: cursor.fetchmany(chunk_rows), []):
+                cols = []
+                for get, conv in zip(getters, converters):
+                    values = map(get, batch)
+                    cols.append(list(map(conv, values) if conv else values))
+                yield self._build_frame(cols, columns)
         except Exception as error:
             self.log_error(sql, error)
-            return pd.DataFrame()
+            raise
         finally:
             if cursor:
                 cursor.close()
             if connection:
-                connection.close()
+                self.release_connection(connection)
+
+    @staticmethod
+    def _build_frame(cols: List[list], columns: List[str]) -> pd.DataFrame:
+        """Monta o DataFrame a partir das listas por coluna (chaves posicionais preservam nomes repetidos)"""
+        import pandas as pd  # type: ignore
+        
+        df = pd.DataFrame(dict(enumerate(cols)), columns=range(len(cols)))
+        df.columns = columns
+        return df
 
     # FUNÇÃO PARA EXECUTAR UPDATE E INSERT
     def update(self, sql: str) -> int:
@@ -194,8 +359,54 @@ class OracleDatabase:
             if cursor:
                 cursor.close()
             if connection:
-                connection.close()
+                self.release_connection(connection)
                 
+    # FUNÇÃO PARA EXECUTAR UPDATE E INSERT EM LOTE (ARRAY DML)
+    def update_many(self, sql: str, rows: List[Union[Dict[str, Any], tuple]], batch: int = 1000,
+                    input_sizes: Optional[Union[Dict[str, Any], list]] = None) -> int:
+        """
+        Executa o mesmo comando com bind para cada item de rows, em lotes de executemany
+        (uma ida ao banco por lote), com um único commit ao final.
+        
+        Args:
+            sql: Comando com binds (:1, :2... ou :nome)
+            rows: Lista de tuplas ou dicionários com os valores de bind
+            batch: Quantidade de linhas por executemany
+            input_sizes: Tipos/tamanhos dos binds para setinputsizes (opcional)
+            
+        Returns:
+            Total de linhas afetadas (0 em caso de erro, com rollback)
+        """
+        if not rows:
+            return 0
+        connection = None
+        cursor = None
+        rowcount = 0
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            if input_sizes:
+                # Um buffer por coluna alocado uma vez para todos os lotes
+                if isinstance(input_sizes, dict):
+                    cursor.setinputsizes(**input_sizes)
+                else:
+                    cursor.setinputsizes(*input_sizes)
+            for start in range(0, len(rows), batch):
+                cursor.executemany(sql, rows[start:start + batch])
+                rowcount += cursor.rowcount
+            connection.commit()
+            return rowcount
+        except Exception as error:
+            if connection:
+                connection.rollback()
+            self.log_error(sql, error)
+            return 0
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                self.release_connection(connection)
+
     # FUNÇÃO PARA EXECUTAR BLOCOS PL/SQL ANÔNIMOS
     def executar_bloco_pl_sql(self, bloco_pl_sql: str, parametros: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -214,7 +425,7 @@ class OracleDatabase:
         """
         connection = None
         cursor = None
-        start_time = pd.Timestamp.now()
+        start_time = time.perf_counter()
         result = {
             'success': False,
             'rowcount': 0,
@@ -225,7 +436,7 @@ class OracleDatabase:
         try:
             # Log de início da execução
             logger.info(f"Iniciando execução de bloco PL/SQL")
-            if parametros:
+            if parametros and logger.isEnabledFor(logging.INFO):
                 param_log = {k: v for k, v in parametros.items() if not isinstance(v, (list, dict))}
                 logger.info(f"Parâmetros: {param_log}")
             
@@ -241,17 +452,8 @@ class OracleDatabase:
                 for key, value in parametros.items():
                     # Verifica se é um parâmetro de saída (formato: 'out:tipo')
                     if isinstance(value, str) and value.startswith('out:'):
-                        tipo = value.split(':')[1].strip().upper()
-                        if tipo == 'NUMBER':
-                            bind_vars[key] = cursor.var(cx_Oracle.NUMBER)
-                        elif tipo == 'STRING' or tipo == 'VARCHAR2':
-                            bind_vars[key] = cursor.var(cx_Oracle.STRING)
-                        elif tipo == 'DATE':
-                            bind_vars[key] = cursor.var(cx_Oracle.DATETIME)
-                        elif tipo == 'CURSOR':
-                            bind_vars[key] = cursor.var(cx_Oracle.CURSOR)
-                        else:
-                            bind_vars[key] = cursor.var(cx_Oracle.STRING)
+                        tipo = value[4:].strip().upper()
+                        bind_vars[key] = cursor.var(_OUT_TYPE_MAP.get(tipo, oracledb.DB_TYPE_VARCHAR))
                         
                         # Registra para recuperar após a execução
                         output_params[key] = bind_vars[key]
@@ -264,13 +466,15 @@ class OracleDatabase:
             
             # Processar parâmetros de saída
             for key, var in output_params.items():
-                if var.type == cx_Oracle.CURSOR:
+                if var.type is oracledb.DB_TYPE_CURSOR:
                     # Processar cursor de saída para DataFrame
                     result_cursor = var.getvalue()
                     if result_cursor:
+                        result_cursor.arraysize = self.arraysize
                         # Obter nomes das colunas
                         columns = [col[0].lower() for col in result_cursor.description]
                         rows = result_cursor.fetchall()
+                        import pandas as pd  # type: ignore
                         result['output_params'][key] = pd.DataFrame(rows, columns=columns)
                         result_cursor.close()
                 else:
@@ -286,7 +490,7 @@ class OracleDatabase:
             result['message'] = "Bloco PL/SQL executado com sucesso"
             
             # Log de conclusão
-            elapsed_time = (pd.Timestamp.now() - start_time).total_seconds()
+            elapsed_time = time.perf_counter() - start_time
             logger.info(f"Bloco PL/SQL executado com sucesso em {elapsed_time:.2f} segundos.")
             return result
             
@@ -303,7 +507,7 @@ class OracleDatabase:
             result['message'] = str(error)
             
             # Log de erro
-            elapsed_time = (pd.Timestamp.now() - start_time).total_seconds()
+            elapsed_time = time.perf_counter() - start_time
             logger.error(f"Erro ao executar bloco PL/SQL após {elapsed_time:.2f} segundos: {error}")
             return result
             
@@ -311,11 +515,10 @@ class OracleDatabase:
             if cursor:
                 cursor.close()
             if connection:
-                connection.close()
+                self.release_connection(connection)
 
     def log_error(self, sql: str, error: Exception) -> None:
-        with open(str(self.log_path / 'oracle-error.log'), 'a', encoding='utf-8') as file:
-            file.write(f'\n\nSQL:\n\n{sql}\n\nERRO [ORACLE]:\n\n{error}')
+        error_logger.error('\n\nSQL:\n\n%s\n\nERRO [ORACLE]:\n\n%s', sql, error)
 
 
 # # Exemplo de uso
@@ -29,6 +29,17 @@ except ImportError:
                         if override or key not in os.environ:
                             os.environ[key.strip()] = value.strip()
 
+__version__ = "2.1.0"
+
+USAGE = """Uso: python run.py [opção]
+
+Sem opções inicia o servidor (porta via SERVER_PORT no .env).
+
+  -v, --version   Mostra a versão e sai
+  -h, --help      Mostra esta ajuda e sai
+  --check         Verifica dependências e .env sem iniciar o servidor
+"""
+
 # Detectar se está rodando como executável compilado
 IS_FROZEN = getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS')
 
@@ -59,8 +70,12 @@ def check_virtual_env():
         logger.info("⚠️  Ambiente virtual não encontrado. Usando Python do sistema.")
         return False
 
-def check_dependencies():
-    """Verifica se as dependências estão instaladas (apenas em modo desenvolvimento)"""
+def check_dependencies(install_missing: bool = True):
+    """
+    Verifica se as dependências estão instaladas (apenas em modo desenvolvimento)
+    
+    Com install_missing=False (--check) apenas informa, sem alterar o ambiente.
+    """
     if IS_FROZEN:
         logger.info("✅ Usando dependências compiladas")
         return True
@@ -70,6 +85,9 @@ def check_dependencies():
         logger.info("✅ FastAPI encontrado")
         return True
     except ImportError:
+        if not install_missing:
+            logger.error("❌ FastAPI não instalado (execute sem --check para instalar as dependências)")
+            return False
         logger.warning("❌ FastAPI não instalado. Instalando dependências...")
         try:
             subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
@@ -106,6 +124,28 @@ def get_server_port():
         logger.warning(f"⚠️  Porta inválida '{port}', usando 2377")
         return 2377
 
+# Templates HTML já lidos (caminho -> conteúdo; em DEV_MODE, caminho -> (mtime_ns, conteúdo))
+_TEMPLATE_CACHE = {}
+_TEMPLATE_MTIME_CACHE = {}
+
+def _read_template(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def load_template(path: str, reload: bool = False) -> str:
+    """Template HTML em memória (com reload=True, relê quando o arquivo muda)"""
+    if reload:
+        # Uma entrada por caminho (mtime, conteúdo): a versão nova sobrescreve a antiga
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = _TEMPLATE_MTIME_CACHE.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            cached = _TEMPLATE_MTIME_CACHE[path] = (mtime_ns, _read_template(path))
+        return cached[1]
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached is None:
+        cached = _TEMPLATE_CACHE[path] = _read_template(path)
+    return cached
+
 def configure_app_unified(app):
     """Configura a aplicação FastAPI com recursos unificados v2.0"""
     from fastapi import Depends, HTTPException, status, Request
@@ -147,6 +187,15 @@ def configure_app_unified(app):
     # Configurar templates Jinja2 para futuras melhorias
     templates = Jinja2Templates(directory="templates")
     
+    # Templates HTML servidos da memória; em DEV_MODE são relidos quando editados
+    reload_templates = os.getenv('DEV_MODE', 'false').lower() == 'true'
+    for template_file in ("home.html", "login.html", "register.html", "consultas.html",
+                          "api-keys.html", "assinatura.html", "history.html", "perfil.html"):
+        try:
+            load_template(f"templates/{template_file}")
+        except OSError as e:
+            logger.warning(f"⚠️ Template não pré-carregado: {template_file} ({e})")
+    
     # =====================================================
     # CONTEXTO DE USUÁRIO HELPER
     # =====================================================
@@ -193,8 +242,7 @@ def configure_app_unified(app):
                 status_code=302
             )
         
-        with open("templates/home.html", "r", encoding="utf-8") as f:
-            html_content = f.read()
+        html_content = load_template("templates/home.html", reload_templates)
         
         # Injetar dados do usuário no HTML se disponível
         if context.get("credits"):
@@ -211,17 +259,21 @@ def configure_app_unified(app):
         """Dashboard - Alias para home"""
         return await home(request)
     
-    @app.get("/login", response_class=HTMLResponse)
-    async def login():
-        """Página de login - Acesso público"""
-        with open("templates/login.html", "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
+    # Templates de acesso público
+    public_templates = [
+        ("/login", "login.html"),
+        ("/register", "register.html"),
+    ]
+    
+    def create_public_template_handler(template_name: str):
+        """Handler genérico para templates públicos"""
+        async def handler():
+            return HTMLResponse(content=load_template(f"templates/{template_name}", reload_templates))
+        return handler
     
-    @app.get("/register", response_class=HTMLResponse)
-    async def register():
-        """Página de registro - Acesso público"""
-        with open("templates/register.html", "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
+    # Registrar templates públicos
+    for route, template in public_templates:
+        app.get(route, response_class=HTMLResponse)(create_public_template_handler(template))
     
     # Templates que requerem autenticação em produção
     protected_templates = [
@@ -242,8 +294,7 @@ def configure_app_unified(app):
                     status_code=302
                 )
             
-            with open(f"templates/{template_name}", "r", encoding="utf-8") as f:
-                return HTMLResponse(content=f.read())
+            return HTMLResponse(content=load_template(f"templates/{template_name}", reload_templates))
         return handler
     
     # Registrar templates protegidos
@@ -583,7 +634,7 @@ def configure_app_unified(app):
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "service": "Valida SaaS Unified",
-            "version": "2.1.0",
+            "version": __version__,
             "database": "connected",
             "services": "enabled" if services_available else "disabled",
             "auth_enabled": auth_available
@@ -617,8 +668,51 @@ def configure_app_unified(app):
     
     return app
 
+def _start_server(port: int):
+    """Importa a aplicação FastAPI/uvicorn (imports pesados) e executa o servidor"""
+    from api.main import app
+    import uvicorn
+    
+    # Aplicar configurações unificadas
+    app = configure_app_unified(app)
+    
+    # Incluir rotas SaaS v1 se disponíveis
+    try:
+        from api.routers.saas_routes import router as saas_router
+        app.include_router(saas_router, prefix="/api/v1", tags=["SaaS"])
+        logger.info("✅ Rotas SaaS v1.0 incluídas")
+    except Exception as e:
+        logger.warning(f"⚠️ Rotas SaaS v1.0 não disponíveis: {e}")
+    
+    logger.info("🎯 Funcionalidades ativas:")
+    logger.info("   • Sistema de créditos transparente")
+    logger.info("   • Custos por tipo (Protestos R$0,15, Receita R$0,05)")
+    logger.info("   • Templates responsivos com autenticação opcional")
+    logger.info("   • APIs v2.0 com dados reais do Supabase")
+    logger.info("   • Modo desenvolvimento/produção configurável")
+    logger.info("")
+    
+    # Executar servidor
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level="info",
+        access_log=True
+    )
+
 def main():
     """Função principal unificada"""
+    # Caminhos rápidos da linha de comando: saem antes de importar FastAPI/uvicorn
+    args = sys.argv[1:2]
+    if args in (["-v"], ["--version"]):
+        print(__version__)
+        return
+    if args in (["-h"], ["--help"]):
+        print(USAGE)
+        return
+    check_only = args == ["--check"]
+    
     try:
         logger.info("="*60)
         logger.info("🚀 Valida SaaS API - Sistema Unificado")
@@ -627,9 +721,10 @@ def main():
         # Verificar ambiente virtual
         check_virtual_env()
         
-        # Verificar dependências
-        if not check_dependencies():
-            logger.error("❌ Falha ao instalar dependências. Encerrando...")
+        # Verificar dependências (--check só verifica; a instalação automática fica no start)
+        if not check_dependencies(install_missing=not check_only):
+            if not check_only:
+                logger.error("❌ Falha ao instalar dependências. Encerrando...")
             sys.exit(1)
         
         # Carregar .env
@@ -638,6 +733,10 @@ def main():
         # Obter porta do servidor
         port = get_server_port()
         
+        if check_only:
+            logger.info(f"✅ Verificação concluída - porta {port}")
+            return
+        
         # Detectar modo
         dev_mode = os.getenv('DEV_MODE', 'false').lower() == 'true'
         mode_text = "DESENVOLVIMENTO" if dev_mode else "PRODUÇÃO"
@@ -651,37 +750,7 @@ def main():
         logger.info(f"🏥 Health Check: http://localhost:{port}/status")
         logger.info("")
         
-        # Importar e configurar a aplicação
-        from api.main import app
-        import uvicorn
-        
-        # Aplicar configurações unificadas
-        app = configure_app_unified(app)
-        
-        # Incluir rotas SaaS v1 se disponíveis
-        try:
-            from api.routers.saas_routes import router as saas_router
-            app.include_router(saas_router, prefix="/api/v1", tags=["SaaS"])
-            logger.info("✅ Rotas SaaS v1.0 incluídas")
-        except Exception as e:
-            logger.warning(f"⚠️ Rotas SaaS v1.0 não disponíveis: {e}")
-        
-        logger.info("🎯 Funcionalidades ativas:")
-        logger.info("   • Sistema de créditos transparente")
-        logger.info("   • Custos por tipo (Protestos R$0,15, Receita R$0,05)")
-        logger.info("   • Templates responsivos com autenticação opcional")
-        logger.info("   • APIs v2.0 com dados reais do Supabase")
-        logger.info("   • Modo desenvolvimento/produção configurável")
-        logger.info("")
-        
-        # Executar servidor
-        uvicorn.run(
-            app,
-            host="0.0.0.0",
-            port=port,
-            log_level="info",
-            access_log=True
-        )
+        _start_server(port)
         
     except KeyboardInterrupt:
         logger.info("🛑 Interrupção recebida, encerrando...")
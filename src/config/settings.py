@@ -39,6 +39,11 @@ class Settings:
     REQUEST_DELAY_MAX: float = float(os.getenv("REQUEST_DELAY_MAX", "3.0"))
     MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "3"))
     
+    # Timeouts da consulta unificada (segundos) - protestos e CNPJa rodam em paralelo
+    PROTESTOS_TIMEOUT_S: float = float(os.getenv("PROTESTOS_TIMEOUT_S", "90"))
+    CNPJA_TIMEOUT_S: float = float(os.getenv("CNPJA_TIMEOUT_S", "60"))
+    CONSULTA_TIMEOUT_TOTAL_S: float = float(os.getenv("CONSULTA_TIMEOUT_TOTAL_S", "120"))
+    
     # Browser/Playwright
     HEADLESS: bool = os.getenv("HEADLESS", "true").lower() == "true"
     BROWSER_TIMEOUT: int = int(os.getenv("BROWSER_TIMEOUT", "30000"))
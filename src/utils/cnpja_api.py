@@ -2,12 +2,14 @@ import os
 import re
 import json
 import time
+import asyncio
 import logging
 import locale
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timedelta
 import requests
 from requests.exceptions import RequestException
+import httpx
 from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
@@ -85,6 +87,7 @@ class CNPJaAPI:
     """
     
     BASE_URL = "https://api.cnpja.com/office/"
+    HTTP_TIMEOUT_S = 30  # Timeout de cada requisição HTTP do cliente assíncrono
     
     def __init__(self, api_key: Optional[str] = None):
         """
@@ -109,6 +112,9 @@ class CNPJaAPI:
         self.last_request_time = 0
         self.request_queue = []
         
+        # Cliente HTTP assíncrono persistente (keep-alive + HTTP/2), criado sob demanda
+        self._async_client: Optional[httpx.AsyncClient] = None
+        
         # Configuração de locale para formatação de valores monetários
         try:
             locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
@@ -294,33 +300,67 @@ class CNPJaAPI:
             
         self.last_request_time = time.time()
     
-
-    # Consulta dados de um CNPJ na API CNPJa. (DADOS BRUTOS DA API)
-    def get_cnpj_data(self, cnpj: str, **params) -> Dict[str, Any]:
+    async def _wait_for_rate_limit_async(self, max_wait: Optional[float] = None) -> None:
         """
-        Consulta dados de um CNPJ na API CNPJa.
+        Versão assíncrona de _wait_for_rate_limit: aguarda sem bloquear o event loop.
+        
+        O cliente é compartilhado entre consultas concorrentes, então o próximo horário
+        livre é reservado (sem await entre a leitura e a escrita) antes de dormir: cada
+        corrotina recebe o seu slot, 20s depois do anterior.
+        
+        Args:
+            max_wait: Espera máxima aceita na fila; acima disso lança CNPJaRateLimitError
+                sem reservar o slot.
+        """
+        now = time.time()
+        slot = max(now, self.last_request_time + 20) if self.last_request_time > 0 else now
+        wait_time = slot - now
+        
+        if max_wait is not None and wait_time > max_wait:
+            raise CNPJaRateLimitError(
+                f"Limite de requisições da CNPJa: próxima vaga em {wait_time:.0f}s (máximo {max_wait:.0f}s)"
+            )
+        
+        self.last_request_time = slot
+        if wait_time > 0:
+            logger.debug(f"Aguardando {wait_time:.2f} segundos para respeitar o rate limit")
+            await asyncio.sleep(wait_time)
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Retorna o cliente httpx assíncrono compartilhado.
+        
+        O cliente mantém conexões keep-alive e HTTP/2 com a API CNPJa, evitando
+        um novo handshake TCP/TLS a cada consulta.
+        """
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                http2=True,
+                timeout=self.HTTP_TIMEOUT_S,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """Fecha o cliente HTTP assíncrono, liberando as conexões mantidas."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    def _prepare_request(self, cnpj: str, params: Dict[str, Any]) -> tuple:
+        """
+        Valida o CNPJ e prepara URL, headers e parâmetros da requisição.
         
         Args:
             cnpj: Número do CNPJ a ser consultado.
-            **params: Parâmetros opcionais da consulta:
-                maxAge (int): Idade máxima em dias para dados do cache (20 dias por padrão).
-                maxStale (int): Tempo máximo em dias para aceitar dados do cache quando a API estiver indisponível.
-                simples (bool): Indica se deve retornar informações do Simples Nacional (sempre True).
-                registrations (str): Filtro para inscrições estaduais (sempre 'BR' para obter todos os estados).
-                geocoding (bool): Indica se deve retornar informações de geolocalização (sempre True).
-                suframa (bool): Indica se deve retornar informações de SUFRAMA (sempre True).
-                strategy (str): Estratégia de cache ('CACHE_IF_FRESH' por padrão).
-                
+            params: Parâmetros da consulta (recebe os valores padrão de cache).
+            
         Returns:
-            Dicionário com os dados do CNPJ consultado.
+            Tupla (formatted_cnpj, url, headers, formatted_params).
             
         Raises:
             CNPJaInvalidCNPJError: Se o CNPJ fornecido tem formato inválido.
-            CNPJaNotFoundError: Se o CNPJ não é encontrado na base.
-            CNPJaRateLimitError: Se o limite de requisições é excedido.
-            CNPJaAuthError: Se há problemas de autenticação.
-            CNPJaServerError: Se ocorre um erro interno no servidor da API.
-            CNPJaAPIError: Para outros erros relacionados à API.
         """
         # Formata e valida o CNPJ
         formatted_cnpj = self._format_cnpj(cnpj)
@@ -361,58 +401,138 @@ class CNPJaAPI:
         param_str = "&".join([f"{k}={v}" for k, v in formatted_params.items()])
         logger.debug(f"URL de requisição: {url}?{param_str}")
         
+        return formatted_cnpj, url, headers, formatted_params
+    
+    def _save_response_log(self, formatted_cnpj: str, url: str, headers: Dict[str, str],
+                           formatted_params: Dict[str, Any], response, body: Any = None) -> None:
+        """
+        Salva a resposta bruta da API em arquivo JSON.
+        
+        Args:
+            formatted_cnpj: CNPJ contendo apenas números.
+            url: URL requisitada.
+            headers: Headers enviados.
+            formatted_params: Parâmetros enviados.
+            response: Resposta HTTP (requests ou httpx).
+            body: Corpo JSON já decodificado (evita um segundo response.json()).
+        """
+        # Log dos parâmetros enviados e recebidos
+        logger.debug(f"Parâmetros enviados: {formatted_params}")
+        logger.debug(f"Status code: {response.status_code}")
+        logger.debug(f"Headers da resposta: {response.headers}")
+        
+        # Salva a resposta bruta em arquivo JSON
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        response_log_file = LOG_DIR_CNPJA_RESPONSES / f"{formatted_cnpj}_{timestamp}_response.json"
+        
+        # Cria um dicionário com os dados da resposta
+        response_data = {
+            "url": url,
+            "method": "GET",
+            "params": formatted_params,
+            "headers_sent": dict(headers),
+            "status_code": response.status_code,
+            "headers_received": dict(response.headers),
+            "timestamp": datetime.now().isoformat(),
+            "response_body": (body if body is not None else response.json()) if response.status_code == 200 else response.text
+        }
+        
+        # Salva o arquivo
+        try:
+            with open(response_log_file, "w", encoding="utf-8") as f:
+                json.dump(response_data, f, indent=4, ensure_ascii=False)
+            logger.info(f"Resposta da API salva em {response_log_file}")
+        except Exception as e:
+            logger.error(f"Erro ao salvar resposta da API: {str(e)}")
+    
+    def _raise_for_status(self, cnpj: str, response) -> None:
+        """
+        Converte status HTTP de erro nas exceções da API CNPJa.
+        
+        Os status 200, 429 e 503 são tratados pelo chamador (dados, retry e fallback).
+        
+        Raises:
+            CNPJaAPIError, CNPJaAuthError, CNPJaNotFoundError, CNPJaServerError
+        """
+        if response.status_code == 400:
+            raise CNPJaAPIError(f"Requisição inválida: {response.text}")
+        elif response.status_code == 401:
+            raise CNPJaAuthError("Credenciais inválidas ou expiradas")
+        elif response.status_code == 403:
+            raise CNPJaAuthError("Acesso negado")
+        elif response.status_code == 404:
+            raise CNPJaNotFoundError(f"CNPJ {cnpj} não encontrado")
+        elif response.status_code >= 500:
+            raise CNPJaServerError(f"Erro interno do servidor: {response.text}")
+        else:
+            raise CNPJaAPIError(f"Erro desconhecido. Status: {response.status_code}, Resposta: {response.text}")
+    
+    def _offline_fallback_params(self, response, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Trata o status 503 (serviço offline) retornando parâmetros de fallback.
+        
+        Raises:
+            CNPJaServerError: Se não houver fallback possível.
+        """
+        error_data = response.json() if response.text else {}
+        service_name = error_data.get('message', 'serviço').replace(' service is offline', '')
+        logger.warning(f"Serviço {service_name} temporariamente offline. Tentando fallback...")
+        
+        # Tentar sem o serviço problemático
+        if 'simples' in params and params['simples']:
+            logger.info("Tentando consulta sem dados do Simples Nacional...")
+            fallback_params = params.copy()
+            fallback_params['simples'] = False
+            return fallback_params
+        raise CNPJaServerError(f"Serviço {service_name} temporariamente offline: {response.text}")
+    
+
+    # Consulta dados de um CNPJ na API CNPJa. (DADOS BRUTOS DA API)
+    def get_cnpj_data(self, cnpj: str, **params) -> Dict[str, Any]:
+        """
+        Consulta dados de um CNPJ na API CNPJa.
+        
+        Args:
+            cnpj: Número do CNPJ a ser consultado.
+            **params: Parâmetros opcionais da consulta:
+                maxAge (int): Idade máxima em dias para dados do cache (20 dias por padrão).
+                maxStale (int): Tempo máximo em dias para aceitar dados do cache quando a API estiver indisponível.
+                simples (bool): Indica se deve retornar informações do Simples Nacional (sempre True).
+                registrations (str): Filtro para inscrições estaduais (sempre 'BR' para obter todos os estados).
+                geocoding (bool): Indica se deve retornar informações de geolocalização (sempre True).
+                suframa (bool): Indica se deve retornar informações de SUFRAMA (sempre True).
+                strategy (str): Estratégia de cache ('CACHE_IF_FRESH' por padrão).
+                
+        Returns:
+            Dicionário com os dados do CNPJ consultado.
+            
+        Raises:
+            CNPJaInvalidCNPJError: Se o CNPJ fornecido tem formato inválido.
+            CNPJaNotFoundError: Se o CNPJ não é encontrado na base.
+            CNPJaRateLimitError: Se o limite de requisições é excedido.
+            CNPJaAuthError: Se há problemas de autenticação.
+            CNPJaServerError: Se ocorre um erro interno no servidor da API.
+            CNPJaAPIError: Para outros erros relacionados à API.
+        """
+        formatted_cnpj, url, headers, formatted_params = self._prepare_request(cnpj, params)
+        
         # Aguarda o rate limit se necessário
         self._wait_for_rate_limit()
         
         try:
             # Faz a requisição para a API
             response = requests.get(url, headers=headers, params=formatted_params)
-            
-            # Log dos parâmetros enviados e recebidos
-            logger.debug(f"Parâmetros enviados: {formatted_params}")
-            logger.debug(f"Status code: {response.status_code}")
-            logger.debug(f"Headers da resposta: {response.headers}")
-            
-            # Salva a resposta bruta em arquivo JSON
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            response_log_file = LOG_DIR_CNPJA_RESPONSES / f"{formatted_cnpj}_{timestamp}_response.json"
-            
-            # Cria um dicionário com os dados da resposta
-            response_data = {
-                "url": url,
-                "method": "GET",
-                "params": formatted_params,
-                "headers_sent": dict(headers),
-                "status_code": response.status_code,
-                "headers_received": dict(response.headers),
-                "timestamp": datetime.now().isoformat(),
-                "response_body": response.json() if response.status_code == 200 else response.text
-            }
-            
-            # Salva o arquivo
-            try:
-                with open(response_log_file, "w", encoding="utf-8") as f:
-                    json.dump(response_data, f, indent=4, ensure_ascii=False)
-                logger.info(f"Resposta da API salva em {response_log_file}")
-            except Exception as e:
-                logger.error(f"Erro ao salvar resposta da API: {str(e)}")
+            self._save_response_log(formatted_cnpj, url, headers, formatted_params, response)
             
             # Trata os erros com base no status code
             if response.status_code == 200:
                 data = response.json()
                 # Log para debug
-                logger.debug(f"Resposta da API para CNPJ {formatted_cnpj}: {json.dumps(data, indent=2)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Resposta da API para CNPJ {formatted_cnpj}: {json.dumps(data, indent=2)}")
                 # Adiciona ao cache
                 self._add_to_cache(formatted_cnpj, data, params)
                 return data
-            elif response.status_code == 400:
-                raise CNPJaAPIError(f"Requisição inválida: {response.text}")
-            elif response.status_code == 401:
-                raise CNPJaAuthError("Credenciais inválidas ou expiradas")
-            elif response.status_code == 403:
-                raise CNPJaAuthError("Acesso negado")
-            elif response.status_code == 404:
-                raise CNPJaNotFoundError(f"CNPJ {cnpj} não encontrado")
             elif response.status_code == 429:
                 wait_time = int(response.headers.get('Retry-After', 60))
                 logger.warning(f"Limite de requisições excedido. Aguardando {wait_time} segundos.")
@@ -421,22 +541,9 @@ class CNPJaAPI:
                 return self.get_cnpj_data(cnpj, **params)
             elif response.status_code == 503:
                 # Serviço temporariamente indisponível - tentar fallback
-                error_data = response.json() if response.text else {}
-                service_name = error_data.get('message', 'serviço').replace(' service is offline', '')
-                logger.warning(f"Serviço {service_name} temporariamente offline. Tentando fallback...")
-                
-                # Tentar sem o serviço problemático
-                if 'simples' in params and params['simples']:
-                    logger.info("Tentando consulta sem dados do Simples Nacional...")
-                    fallback_params = params.copy()
-                    fallback_params['simples'] = False
-                    return self.get_cnpj_data(cnpj, **fallback_params)
-                else:
-                    raise CNPJaServerError(f"Serviço {service_name} temporariamente offline: {response.text}")
-            elif response.status_code >= 500:
-                raise CNPJaServerError(f"Erro interno do servidor: {response.text}")
+                return self.get_cnpj_data(cnpj, **self._offline_fallback_params(response, params))
             else:
-                raise CNPJaAPIError(f"Erro desconhecido. Status: {response.status_code}, Resposta: {response.text}")
+                self._raise_for_status(cnpj, response)
                 
         except RequestException as e:
             logger.error(f"Erro na requisição HTTP: {str(e)}")
@@ -446,6 +553,51 @@ class CNPJaAPI:
                 return self.cache[formatted_cnpj]['data']
             raise CNPJaAPIError(f"Erro na comunicação com a API: {str(e)}")
     
+    async def get_cnpj_data_async(self, cnpj: str, *, max_wait: Optional[float] = None, **params) -> Dict[str, Any]:
+        """
+        Versão assíncrona de get_cnpj_data usando o cliente httpx persistente.
+        
+        Aceita os mesmos parâmetros e lança as mesmas exceções de get_cnpj_data,
+        sem bloquear o event loop durante a requisição ou o rate limit. max_wait
+        limita a espera na fila do rate limit (ver _wait_for_rate_limit_async).
+        """
+        formatted_cnpj, url, headers, formatted_params = self._prepare_request(cnpj, params)
+        
+        # Aguarda o rate limit se necessário
+        await self._wait_for_rate_limit_async(max_wait)
+        
+        try:
+            # Faz a requisição reutilizando as conexões do cliente compartilhado
+            response = await self._get_async_client().get(url, headers=headers, params=formatted_params)
+            
+            # Decodifica o corpo uma vez e grava o log (open + json.dump) fora do event loop
+            body = response.json() if response.status_code == 200 else None
+            await asyncio.to_thread(self._save_response_log, formatted_cnpj, url, headers,
+                                    formatted_params, response, body)
+            
+            if response.status_code == 200:
+                data = body
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Resposta da API para CNPJ {formatted_cnpj}: {json.dumps(data, indent=2)}")
+                self._add_to_cache(formatted_cnpj, data, params)
+                return data
+            elif response.status_code == 429:
+                wait_time = int(response.headers.get('Retry-After', 60))
+                logger.warning(f"Limite de requisições excedido. Aguardando {wait_time} segundos.")
+                await asyncio.sleep(wait_time)
+                return await self.get_cnpj_data_async(cnpj, max_wait=max_wait, **params)
+            elif response.status_code == 503:
+                return await self.get_cnpj_data_async(cnpj, max_wait=max_wait, **self._offline_fallback_params(response, params))
+            else:
+                self._raise_for_status(cnpj, response)
+                
+        except httpx.HTTPError as e:
+            logger.error(f"Erro na requisição HTTP: {str(e)}")
+            if params.get('enable_cache_fallback', False) and formatted_cnpj in self.cache:
+                logger.warning(f"Usando cache expirado para o CNPJ {formatted_cnpj} devido a falha na requisição")
+                return self.cache[formatted_cnpj]['data']
+            raise CNPJaAPIError(f"Erro na comunicação com a API: {str(e)}")
+    
     def extract_basic_info(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extrai informações básicas da empresa da resposta da API.
@@ -831,17 +983,7 @@ class CNPJaAPI:
             CNPJaServerError: Se ocorre um erro interno no servidor da API.
             CNPJaAPIError: Para outros erros relacionados à API.
         """
-        # Filtrar parâmetros válidos para a API CNPJa
-        # A API só aceita: simples, registrations, geocoding, suframa, strategy
-        api_params = {}
-        valid_api_params = ['simples', 'registrations', 'geocoding', 'suframa', 'strategy']
-        
-        for param, value in params.items():
-            if param in valid_api_params and value is not None:
-                # Tratamento especial para registrations - só enviar se for 'BR'
-                if param == 'registrations' and value != 'BR':
-                    continue  # Não enviar para a API se não for 'BR'
-                api_params[param] = value
+        api_params = self._filter_api_params(params)
         
         # Obtém os dados da API (pode ser parcial se alguns serviços estiverem offline)
         try:
@@ -855,6 +997,66 @@ class CNPJaAPI:
             else:
                 raise
         
+        return self._structure_company_info(cnpj, data, params)
+    
+    async def get_all_company_info_async(self, cnpj: str, *, max_wait: Optional[float] = None, **params) -> Dict[str, Any]:
+        """
+        Versão assíncrona de get_all_company_info (usa get_cnpj_data_async).
+        
+        Aceita os mesmos parâmetros e lança as mesmas exceções de get_all_company_info;
+        max_wait é repassado ao rate limit.
+        """
+        api_params = self._filter_api_params(params)
+        
+        # Obtém os dados da API (pode ser parcial se alguns serviços estiverem offline)
+        try:
+            data = await self.get_cnpj_data_async(cnpj, max_wait=max_wait, **api_params)
+        except CNPJaServerError as e:
+            # Se for erro de serviço offline, tentar com parâmetros mínimos
+            if "offline" in str(e).lower():
+                logger.warning(f"Alguns serviços estão offline. Tentando consulta básica para CNPJ {cnpj}")
+                minimal_params = {'strategy': api_params.get('strategy', 'CACHE_IF_FRESH')}
+                data = await self.get_cnpj_data_async(cnpj, max_wait=max_wait, **minimal_params)
+            else:
+                raise
+        
+        return self._structure_company_info(cnpj, data, params)
+    
+    def _filter_api_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Filtra os parâmetros aceitos pela API CNPJa.
+        
+        Args:
+            params: Parâmetros recebidos por get_all_company_info.
+            
+        Returns:
+            Dicionário apenas com os parâmetros enviados à API.
+        """
+        # Filtrar parâmetros válidos para a API CNPJa
+        # A API só aceita: simples, registrations, geocoding, suframa, strategy
+        api_params = {}
+        valid_api_params = ['simples', 'registrations', 'geocoding', 'suframa', 'strategy']
+        
+        for param, value in params.items():
+            if param in valid_api_params and value is not None:
+                # Tratamento especial para registrations - só enviar se for 'BR'
+                if param == 'registrations' and value != 'BR':
+                    continue  # Não enviar para a API se não for 'BR'
+                api_params[param] = value
+        return api_params
+    
+    def _structure_company_info(self, cnpj: str, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Estrutura os dados brutos da API por categoria, conforme os parâmetros habilitados.
+        
+        Args:
+            cnpj: Número do CNPJ consultado.
+            data: Dados brutos retornados pela API.
+            params: Parâmetros recebidos por get_all_company_info.
+            
+        Returns:
+            Dicionário com as informações da empresa estruturadas por categoria.
+        """
         # Inicializa o dicionário de dados estruturados
         structured_data = {}
         